@@ -0,0 +1,208 @@
+"""Memory / throughput benchmark: LaserStroke (array columns) vs the old list of (QPointF, t) tuples.
+
+Replays a synthetic scribble (random mouse moves at --rate Hz for --seconds) into both
+classes on a simulated clock, then measures:
+  - memory held by the stroke (tracemalloc) and bytes per point
+  - add_point throughput
+  - one painted frame at the end of the scribble (QImage, offscreen), old draw loop vs
+    the current one (same logic as Overlay.draw_stroke, which can't be imported off Windows)
+
+    python bench_stroke.py [--seconds 10] [--rate 120] [--frames 20]
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import Qt, QPointF, QLineF
+from PyQt6.QtGui import QColor, QGuiApplication, QImage, QPainter, QPen
+
+import utils
+from utils import LaserStroke
+
+LASER = {'color': '#ff0000', 'gradient': False, 'glow_strength': 3, 'size': 8}
+
+
+class Clock:
+    # Stands in for the time module so both classes see the same simulated timestamps
+    def __init__(self, start):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+
+clock = Clock(time.time())
+
+
+class LegacyStroke:
+    # The previous implementation, kept here as the baseline
+    def __init__(self, color, lifetime=3.0):
+        self.points = []
+        self.color = color
+        self.lifetime = lifetime
+        self.creation_time = clock.time()
+        self.is_finished = False
+
+    def add_point(self, point):
+        current_time = clock.time()
+        if not self.points:
+            self.points.append((point, current_time))
+            return
+        last_point, last_time = self.points[-1]
+        dist = ((point.x() - last_point.x())**2 + (point.y() - last_point.y())**2)**0.5
+        if dist > 2:
+            steps = int(dist / 2)
+            for i in range(1, steps):
+                t = i / steps
+                x = last_point.x() + (point.x() - last_point.x()) * t
+                y = last_point.y() + (point.y() - last_point.y()) * t
+                interpolated_time = last_time + (current_time - last_time) * t
+                self.points.append((QPointF(x, y), interpolated_time))
+        self.points.append((point, current_time))
+
+
+def legacy_draw(painter, stroke, current_time):
+    # Old Overlay.draw_stroke loop (never pruned, so every point is visited each frame)
+    if len(stroke.points) < 2: return
+    base_color = QColor(LASER['color'])
+    width, glow_str = LASER['size'], LASER['glow_strength']
+    points = stroke.points
+    for i in range(len(points) - 1):
+        pt1, t1 = points[i]
+        pt2, t2 = points[i+1]
+        age = current_time - t1
+        life = stroke.lifetime
+        if age > life: continue
+        opacity = max(0, min(1.0, 1 - age / life))
+        if opacity <= 0: continue
+        seg_color = base_color
+        alpha = int(255 * opacity)
+        seg_color.setAlpha(alpha // 3)
+        glow_pen = QPen(seg_color)
+        glow_pen.setWidth(int(width * glow_str))
+        glow_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        painter.setPen(glow_pen)
+        painter.drawLine(pt1, pt2)
+        core_color = QColor(255, 255, 255)
+        core_color.setAlpha(min(255, int(alpha * 2)))
+        core_pen = QPen(core_color)
+        core_pen.setWidth(max(2, int(width * 0.3)))
+        core_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        painter.setPen(core_pen)
+        painter.drawLine(pt1, pt2)
+
+
+def array_draw(painter, stroke, current_time):
+    # Current Overlay.draw_stroke (prune happens in paintEvent)
+    stroke.prune(current_time)
+    xs, ys, ts = stroke.xs, stroke.ys, stroke.ts
+    if len(ts) < 2: return
+    base_color = QColor(LASER['color'])
+    width, glow_str = LASER['size'], LASER['glow_strength']
+    life = stroke.lifetime
+    glow_pen = QPen()
+    glow_pen.setWidth(int(width * glow_str))
+    glow_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+    core_pen = QPen()
+    core_pen.setWidth(max(2, int(width * 0.3)))
+    core_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+    core_color = QColor(255, 255, 255)
+    for i in range(stroke.first_live(current_time), len(ts) - 1):
+        age = current_time - ts[i]
+        opacity = max(0, min(1.0, 1 - age / life))
+        if opacity <= 0: continue
+        seg_color = base_color
+        line = QLineF(xs[i], ys[i], xs[i + 1], ys[i + 1])
+        alpha = int(255 * opacity)
+        seg_color.setAlpha(alpha // 3)
+        glow_pen.setColor(seg_color)
+        painter.setPen(glow_pen)
+        painter.drawLine(line)
+        core_color.setAlpha(min(255, int(alpha * 2)))
+        core_pen.setColor(core_color)
+        painter.setPen(core_pen)
+        painter.drawLine(line)
+
+
+def scribble(seconds, rate, seed=0):
+    # Mouse positions every 1/rate s: a random walk with moves of up to ~40 px
+    rng = random.Random(seed)
+    x, y = 960.0, 540.0
+    moves = []
+    for _ in range(int(seconds * rate)):
+        x = min(1900.0, max(20.0, x + rng.uniform(-40, 40)))
+        y = min(1060.0, max(20.0, y + rng.uniform(-40, 40)))
+        moves.append((x, y))
+    return moves
+
+
+def replay(make_stroke, moves, rate):
+    # Returns (stroke, seconds spent in add_point, bytes allocated by the stroke)
+    start_time = clock.now
+    points = [QPointF(x, y) for x, y in moves]  # QCursor.pos() hands out a new QPointF per event anyway
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stroke = make_stroke()
+    elapsed = 0.0
+    for i, point in enumerate(points):
+        clock.now = start_time + i / rate
+        started = time.perf_counter()
+        stroke.add_point(point)
+        elapsed += time.perf_counter() - started
+    del points
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return stroke, elapsed, held
+
+
+def frame_time(draw, stroke, current_time, frames):
+    image = QImage(1920, 1080, QImage.Format.Format_ARGB32_Premultiplied)
+    best = float('inf')
+    for _ in range(frames):
+        image.fill(0)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        started = time.perf_counter()
+        draw(painter, stroke, current_time)
+        best = min(best, time.perf_counter() - started)
+        painter.end()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rate', type=float, default=120)
+    parser.add_argument('--frames', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QGuiApplication([])
+    utils.time = clock
+    moves = scribble(args.seconds, args.rate)
+    color = QColor(LASER['color'])
+
+    rows = []
+    for name, make, draw, count in (
+        ('list of tuples', lambda: LegacyStroke(color), legacy_draw, lambda s: len(s.points)),
+        ('array columns', lambda: LaserStroke(color), array_draw, len),
+    ):
+        clock.now = 1_000_000.0
+        stroke, add_time, held = replay(make, moves, args.rate)
+        points = count(stroke)
+        frame = frame_time(draw, stroke, clock.now, args.frames)
+        rows.append((name, points, held, add_time, frame))
+
+    print(f"{args.seconds:g}s of scribbling at {args.rate:g} Hz ({len(moves)} mouse events), lifetime 3s")
+    print(f"{'storage':<16} {'points':>8} {'memory':>10} {'B/point':>8} {'add_point/s':>12} {'frame':>10}")
+    for name, points, held, add_time, frame in rows:
+        print(f"{name:<16} {points:>8} {held / 1024:>8.0f}KB {held / points:>8.1f} "
+              f"{len(moves) / add_time:>12,.0f} {frame * 1000:>8.2f}ms")
+    del app
+
+
+if __name__ == '__main__':
+    main()
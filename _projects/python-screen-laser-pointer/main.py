@@ -242,6 +242,8 @@ def main():
                      with open("debug.log", "a") as f: f.write(f"Release Error: {e}\n")
 
             def finish_stroke(self):
+                if self.current_stroke_obj:
+                    self.current_stroke_obj.is_finished = True
                 self.current_stroke_obj = None
 
             def add_box_stroke(self, p1, p2):
@@ -261,6 +263,7 @@ def main():
                 
                 stroke = LaserStroke(col, lifetime=life)
                 stroke.width = sz
+                stroke.is_finished = True
                 ts = time.time()
 
                 if style == 'circle':
@@ -273,7 +276,7 @@ def main():
                         ang = i * (2 * math.pi) / segments
                         px = cx + rx * math.cos(ang)
                         py = cy + ry * math.sin(ang)
-                        stroke.points.append((QPointF(px, py), ts))
+                        stroke.append(px, py, ts)
                         
                 elif style == 'rounded':
                     r = cfg.config['box'].get('radius', 15)
@@ -291,32 +294,31 @@ def main():
                             a = start_ang + (end_ang - start_ang) * i / steps
                             px = cx + r * math.cos(a)
                             py = cy + r * math.sin(a)
-                            stroke.points.append((QPointF(px, py), ts))
+                            stroke.append(px, py, ts)
 
                     # Top Edge
-                    stroke.points.append((QPointF(lx+r, ty), ts))
-                    stroke.points.append((QPointF(rx-r, ty), ts))
+                    stroke.append(lx+r, ty, ts)
+                    stroke.append(rx-r, ty, ts)
                     # TR Corner
                     add_arc(rx-r, ty+r, -math.pi/2, 0)
                     # Right Edge
-                    stroke.points.append((QPointF(rx, by-r), ts))
+                    stroke.append(rx, by-r, ts)
                     # BR Corner
                     add_arc(rx-r, by-r, 0, math.pi/2)
                     # Bottom Edge
-                    stroke.points.append((QPointF(lx+r, by), ts))
+                    stroke.append(lx+r, by, ts)
                     # BL Corner
                     add_arc(lx+r, by-r, math.pi/2, math.pi)
                     # Left Edge
-                    stroke.points.append((QPointF(lx, ty+r), ts))
+                    stroke.append(lx, ty+r, ts)
                     # TL Corner
                     add_arc(lx+r, ty+r, math.pi, 3*math.pi/2)
                     # Close
-                    stroke.points.append((QPointF(lx+r, ty), ts))
+                    stroke.append(lx+r, ty, ts)
 
                 else:
                     # Rect
-                    pts = [QPointF(x1, y1), QPointF(x2, y1), QPointF(x2, y2), QPointF(x1, y2), QPointF(x1, y1)]
-                    for pt in pts: stroke.points.append((pt, ts))
+                    stroke.extend([x1, x2, x2, x1, x1], [y1, y1, y2, y2, y1], ts)
 
                 shared_strokes.append(stroke)
                 
@@ -4,7 +4,7 @@ import math
 import win32gui
 import win32con
 from PyQt6.QtWidgets import QMainWindow
-from PyQt6.QtCore import Qt, QTimer, QPointF, pyqtSlot
+from PyQt6.QtCore import Qt, QTimer, QPointF, QLineF, pyqtSlot
 from PyQt6.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient, QPainterPath
 
 class Overlay(QMainWindow):
@@ -124,7 +124,10 @@ class Overlay(QMainWindow):
         current_time = time.time()
         
         for stroke in self.strokes:
+            stroke.prune(current_time)
             self.draw_stroke(painter, stroke, current_time)
+        # Finished strokes that have fully faded out are dropped (the list is shared by all overlays)
+        self.strokes[:] = [s for s in self.strokes if not (s.is_finished and s.is_expired(current_time))]
             
         if self.drawing_active and self.box_mode and self.box_preview_rect:
              self.draw_box_preview(painter)
@@ -154,7 +157,8 @@ class Overlay(QMainWindow):
             painter.drawLine(int(cx), int(cy-7), int(cx), int(cy+7))
 
     def draw_stroke(self, painter, stroke, current_time):
-        if len(stroke.points) < 2: return
+        xs, ys, ts = stroke.xs, stroke.ys, stroke.ts
+        if len(ts) < 2: return
         
         # Determine Color
         config_col = self.cfg['laser']['color']
@@ -163,46 +167,44 @@ class Overlay(QMainWindow):
         
         glow_str = self.cfg['laser']['glow_strength']
         width = self.cfg['laser']['size']
-
-        points = stroke.points
-        
-        # Simplification: Draw segments
-        for i in range(len(points) - 1):
-            pt1, t1 = points[i]
-            pt2, t2 = points[i+1]
-            
-            age = current_time - t1
-            life = stroke.lifetime
-            if age > life: continue
-                
+        life = stroke.lifetime
+
+        # Pens are reused across segments, only their color changes
+        glow_pen = QPen()
+        glow_pen.setWidth(int(width * glow_str))
+        glow_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        core_pen = QPen()
+        core_pen.setWidth(max(2, int(width * 0.3)))
+        core_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        core_color = QColor(255, 255, 255)
+        
+        # Simplification: Draw segments (expired ones are a prefix, skipped in one step)
+        for i in range(stroke.first_live(current_time), len(ts) - 1):
+            age = current_time - ts[i]
             opacity = max(0, min(1.0, 1 - age / life))
             if opacity <= 0: continue
             
             if use_grad:
                 # Rainbow based on age or screen pos? Let's do Rainbow Time
-                hue = (current_time * 50 + i * 5) % 360
+                hue = (current_time * 50 + (stroke.offset + i) * 5) % 360
                 seg_color = QColor.fromHsl(int(hue), 255, 150)
             else:
                 seg_color = base_color
 
+            line = QLineF(xs[i], ys[i], xs[i + 1], ys[i + 1])
+
             # Draw Glow
             alpha = int(255 * opacity)
             seg_color.setAlpha(alpha // 3)
-            
-            glow_pen = QPen(seg_color)
-            glow_pen.setWidth(int(width * glow_str))
-            glow_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+            glow_pen.setColor(seg_color)
             painter.setPen(glow_pen)
-            painter.drawLine(pt1, pt2)
+            painter.drawLine(line)
 
             # Draw Core
-            core_color = QColor(255, 255, 255)
             core_color.setAlpha(min(255, int(alpha * 2)))
-            core_pen = QPen(core_color)
-            core_pen.setWidth(max(2, int(width * 0.3)))
-            core_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+            core_pen.setColor(core_color)
             painter.setPen(core_pen)
-            painter.drawLine(pt1, pt2)
+            painter.drawLine(line)
 
     def draw_box_preview(self, painter):
         rect = self.box_preview_rect # x, y, w, h
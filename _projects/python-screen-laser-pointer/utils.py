@@ -1,52 +1,80 @@
 import time
+from array import array
+from bisect import bisect_right
 from PyQt6.QtCore import QPointF
 from PyQt6.QtGui import QColor
 
 class LaserStroke:
+    # Points are stored as three array('d') columns (x, y, timestamp) instead of a
+    # list of (QPointF, timestamp) tuples: 24 bytes per point, no per-point objects.
+    # The overlay reads xs / ys / ts directly.
+    __slots__ = ('xs', 'ys', 'ts', 'offset', 'color', 'lifetime', 'creation_time', 'is_finished', 'width')
+
     def __init__(self, color: QColor, lifetime: float = 3.0):
-        self.points = []  # List of (QPointF, timestamp)
+        self.xs = array('d')
+        self.ys = array('d')
+        self.ts = array('d')  # Never decreases, so expired points are always a prefix
+        self.offset = 0  # Points removed by prune() so far (keeps gradient hue stable)
         self.color = color
         self.lifetime = lifetime
         self.creation_time = time.time()
         self.is_finished = False # Set when stroke is done (mouse released)
+        self.width = None
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, x: float, y: float, t: float):
+        self.xs.append(x)
+        self.ys.append(y)
+        self.ts.append(t)
+
+    def extend(self, xs, ys, t):
+        # Bulk append; t is either one timestamp for all points or a sequence
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        if isinstance(t, (int, float)):
+            self.ts.extend(array('d', [t]) * (len(self.xs) - len(self.ts)))
+        else:
+            self.ts.extend(t)
 
     def add_point(self, point: QPointF):
         current_time = time.time()
-        
-        if not self.points:
-            self.points.append((point, current_time))
+        x, y = point.x(), point.y()
+
+        if not self.ts:
+            self.append(x, y, current_time)
             return
-            
-        last_point, last_time = self.points[-1]
-        dist = ((point.x() - last_point.x())**2 + (point.y() - last_point.y())**2)**0.5
-        
-        # Interpolate if gap > 2 pixels (Finer smoothness)
+
+        last_x, last_y, last_time = self.xs[-1], self.ys[-1], self.ts[-1]
+        dx, dy = x - last_x, y - last_y
+        dist = (dx * dx + dy * dy) ** 0.5
+
+        # Interpolate if gap > 2 pixels (Finer smoothness), time too to keep the fade smooth
         if dist > 2:
             steps = int(dist / 2)
-            for i in range(1, steps):
-                t = i / steps
-                x = last_point.x() + (point.x() - last_point.x()) * t
-                y = last_point.y() + (point.y() - last_point.y()) * t
-                # Interpolate time as well? Yes, to keep smooth fade
-                interpolated_time = last_time + (current_time - last_time) * t
-                self.points.append((QPointF(x, y), interpolated_time))
-        
-        self.points.append((point, current_time))
-
-    def is_expired(self):
-        if not self.points:
+            fractions = [i / steps for i in range(1, steps)]
+            dt = current_time - last_time
+            self.xs.extend([last_x + dx * f for f in fractions])
+            self.ys.extend([last_y + dy * f for f in fractions])
+            self.ts.extend([last_time + dt * f for f in fractions])
+
+        self.append(x, y, current_time)
+
+    def first_live(self, current_time):
+        # Index of the first point younger than lifetime
+        return bisect_right(self.ts, current_time - self.lifetime)
+
+    def is_expired(self, current_time=None):
+        if not self.ts:
             return True
-        # Check if the last point is older than lifetime? 
-        # Or maybe the whole stroke fades out based on its individual point ages?
-        # Simpler: The whole stroke fades out after the last point is added?
-        # User asked for "about 3 seconds it will disappear".
-        # Let's say points fade individually or the stroke fades as a whole.
-        # "Laser tail" usually means old points disappear. 
-        # "Disappear after 3 seconds" might mean the ink stays for 3s then fades?
-        # Let's go with: Points have a timestamp. We render segments. Opacity based on age.
-        return len(self.points) == 0
+        return current_time is not None and current_time - self.ts[-1] >= self.lifetime
 
     def prune(self, current_time):
         # Remove points older than lifetime
-        self.points = [p for p in self.points if current_time - p[1] < self.lifetime]
-
+        cut = self.first_live(current_time)
+        if cut:
+            del self.xs[:cut]
+            del self.ys[:cut]
+            del self.ts[:cut]
+            self.offset += cut
@@ -1,166 +1,934 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-import yfinance as yf
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
+import socket
+import threading
+import time
+
+from backtest import STAT_FIELDS as BACKTEST_FIELDS, parse_rule, run_backtest
+from cache import STALE, BackgroundRefresher, TTLCache
+from correlation import correlation_matrix, group_average, last_valid, returns_matrix
+from downsample import METHODS as DOWNSAMPLE_METHODS, bucket_starts, downsample
+from history import HistoryStore
+from indicators import IndicatorEngine, WilderRSI, parse_spec
+from intraday import INTRADAY_FIELDS, IntradayBook
+from lazy import LazyModule
+from market_hours import MARKET_TZ, closed_for, is_open, needs_refresh
+from metrics import METRIC_FIELDS, close_matrix, compute_metrics_matrix, metrics_records
+from providers import chunked, create_provider
+from resilience import ResilientProvider
+from responses import columnar, conditional_json
+from scheduler import FetchResult, FetchScheduler
+from screen import ScreenIndex, parse_filters
+from shared import create_shared
+from snapshot import SnapshotStore
+from singleflight import SingleFlight
+from stream import Broadcaster
+from telemetry import (CONTENT_TYPE, ERRORS, REFRESH_SKIPPED, REGISTRY, REQUEST_LATENCY, STAGE_LATENCY,
+                       UPSTREAM_LATENCY, UPSTREAM_RESULTS)
+from universe import load_universe
+
+# numpy、pandas 與 yfinance 在第一次用到時才載入，見 lazy.py
+np = LazyModule('numpy')
+
+# 跨來源的前端需要讀取這些回應標頭（逾時／失敗的代號、快照版本與是否為舊資料）
+EXPOSED_HEADERS = ['X-Timed-Out', 'X-Failed', 'X-Snapshot-Version', 'X-Snapshot-Stale',
+                   'X-Snapshot-Saved-At', 'ETag']
+
+INTERNAL_ERROR = {'error': '伺服器內部錯誤'}
 
 app = Flask(__name__)
-CORS(app)
-app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=EXPOSED_HEADERS)
 
 # ==================== 資料配置 ====================
-CATEGORIZED_TICKERS = {
-    "大盤指數": {
-        "標普500指數": "^GSPC",
-        "納斯達克指數": "^IXIC",
-        "道瓊工業指數": "^DJI",
-        "羅素2000指數": "^RUT",
-        "FAANG (七巨頭)": "^NYFANG",
-        "BTC比特幣": "BTC-USD",
-        "ETH以太幣": "ETH-USD",
-    },
-    "ETF指數": {
-        "標普500 ETF (SPY)": "SPY",
-        "納斯達克100 ETF (QQQ)": "QQQ",
-        "羅素2000 ETF (IWM)": "IWM",
-        "羅素1000價值 ETF (IWD)": "IWD",
-        "羅素1000成長 ETF (IWF)": "IWF",
-        "趨勢板塊 ETF (MTUM)": "MTUM",
-    },
-    "債券與貨幣": {
-        "20年+美債ETF": "TLT",
-        "垃圾債券ETF": "HYG",
-        "VIX恐慌指數": "^VIX",
-        "美元指數": "DX-Y.NYB",
-        "歐元/美元": "EURUSD=X",
-        "英鎊/美元": "GBPUSD=X",
-    },
-    "成長型": {
-        "通訊服務 (IXP)": "IXP",
-        "半導體 (SOXX)": "SOXX",
-        "AI科技ETF (AIQ)": "AIQ",
-        "機器人與AI ETF (BOTZ)": "BOTZ",
-        "科技 (XLK)": "XLK",
-    },
-    "價值型": {
-        "能源 (XLE)": "XLE",
-        "銀行 (KBWB)": "KBWB",
-        "公用事業 (XLU)": "XLU",
-        "房地產 (IYR)": "IYR",
-    },
-    "大宗商品": {
-        "黃金期貨": "GC=F",
-        "白銀期貨": "SI=F",
-        "銅期貨": "HG=F",
-        "WTI原油期貨": "CL=F",
-    },
-    "大型科技權值股": {
-        "蘋果 (AAPL)": "AAPL",
-        "微軟 (MSFT)": "MSFT",
-        "谷歌 (GOOGL)": "GOOGL",
-        "亞馬遜 (AMZN)": "AMZN",
-        "輝達 (NVDA)": "NVDA",
-    },
-    "其他": {
-        "台積電 (TSM)": "TSM",
-        "特斯拉 (TSLA)": "TSLA",
-        "英特爾 (INTC)": "INTC",
-    }
-}
+universe = load_universe(os.environ.get(
+    'UNIVERSE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universe.json')))
+CATEGORIZED_TICKERS = universe.tickers_by_category()
+# 快照、SSE 推播與共享快取只收清單內的代號；其他代號（/api/stock/<任意代號>）只進 quote_cache
+UNIVERSE_TICKERS = frozenset(universe.tickers())
+
+# 批次下載時每次 yf.download 的代號數量（設為 1 則每檔代號各自併發抓取）
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 50))
+
+# 資料來源外加限流、重試與斷路器
+data_provider = ResilientProvider.from_env(create_provider())
+fetch_scheduler = FetchScheduler.from_env()
+
+# 本機日線歷史資料庫（設為 :memory: 則不落地）
+history_store = HistoryStore(os.environ.get(
+    'HISTORY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'history.sqlite3')))
+
+# 快取：CACHE_TTL 秒內視為新鮮，之後 CACHE_STALE_TTL 秒內先回傳舊值並於背景更新
+quote_cache = TTLCache(
+    ttl=float(os.environ.get('CACHE_TTL', 60)),
+    stale_ttl=float(os.environ.get('CACHE_STALE_TTL', 900)),
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 1024)),
+)
+quote_flights = SingleFlight()
+
+# 依交易時段更新：休市且收盤 MARKET_CLOSE_GRACE 秒後已抓過的代號，背景更新不再抓取、
+# 快取延長到下次開盤（MARKET_HOURS=0 則一律依各分類的間隔更新）
+MARKET_HOURS = os.environ.get('MARKET_HOURS', '1') != '0'
+MARKET_CLOSE_GRACE = float(os.environ.get('MARKET_CLOSE_GRACE', 900))
+last_ticker_refresh = {}  # {ticker: 上次抓到預設視窗的時間（美東）}
+
+# /api/stock/<ticker>/history 預設與最多回傳的點數
+HISTORY_POINTS = int(os.environ.get('HISTORY_POINTS', 500))
+HISTORY_MAX_POINTS = int(os.environ.get('HISTORY_MAX_POINTS', 5000))
+
+# /api/correlation 的結果快取，鍵為 (視窗, 日期或快照版本, 分類)
+CORRELATION_MAX_WINDOW = int(os.environ.get('CORRELATION_MAX_WINDOW', 756))
+correlation_cache = TTLCache(
+    ttl=float(os.environ.get('CORRELATION_TTL', 300)), stale_ttl=0,
+    max_entries=int(os.environ.get('CORRELATION_MAX_ENTRIES', 64)),
+)
+
+# /api/backtest：預設回測最近 BACKTEST_YEARS 年、最長 BACKTEST_MAX_YEARS 年，淨值曲線預設 BACKTEST_POINTS 點
+BACKTEST_YEARS = int(os.environ.get('BACKTEST_YEARS', 5))
+BACKTEST_MAX_YEARS = int(os.environ.get('BACKTEST_MAX_YEARS', 20))
+BACKTEST_POINTS = int(os.environ.get('BACKTEST_POINTS', 250))
+backtest_cache = TTLCache(
+    ttl=float(os.environ.get('BACKTEST_TTL', 300)), stale_ttl=0,
+    max_entries=int(os.environ.get('BACKTEST_MAX_ENTRIES', 32)),
+)
+
+
+def set_provider(provider, resilient=True):
+    """替換資料來源（測試或壓測時注入假的 provider）；resilient=False 則不加流量控制"""
+    global data_provider
+    data_provider = ResilientProvider.from_env(provider) if resilient else provider
+
+indicator_engine = IndicatorEngine()
+
+# 盤中模式：每檔保留最近 INTRADAY_CAPACITY 根一分鐘 K 棒，INTRADAY_TTL 秒內沿用上次的結果
+INTRADAY_TTL = float(os.environ.get('INTRADAY_TTL', 30))
+intraday_book = IntradayBook(capacity=int(os.environ.get('INTRADAY_CAPACITY', 390)))
+
+# 預設 365 天視窗指標的版本化快照，與其 SSE 推播
+snapshots = SnapshotStore(history=int(os.environ.get('SNAPSHOT_HISTORY', 256)))
+
+# 快照落地：每次有變動時寫入，啟動時載入並先以 stale 狀態提供，背景更新完成後才換成新值
+# （SNAPSHOT_FILE 設為空字串則停用）
+SNAPSHOT_FILE = os.environ.get(
+    'SNAPSHOT_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'snapshot.json'))
+if SNAPSHOT_FILE and snapshots.restore(SNAPSHOT_FILE):
+    # ttl=0 讓載入的值一被讀取就觸發背景重新抓取
+    for _ticker, _data in snapshots.current()[1].items():
+        quote_cache.set((_ticker, 365), _data, ttl=0)
+broadcaster = Broadcaster()
 
 # ==================== 工具函數 ====================
 
 def calculate_rsi(prices, period=14):
-    """計算 RSI 指標"""
-    if len(prices) < period + 1:
-        return None
-    
-    deltas = np.diff(prices)
-    seed = deltas[:period + 1]
-    up = seed[seed >= 0].sum() / period
-    down = -seed[seed < 0].sum() / period
-    rs = up / down if down != 0 else 0
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    """計算 RSI 指標（單一序列逐筆遞推即可，不需要矩陣版本的配置成本）"""
+    rsi = WilderRSI(period)
+    for price in prices:
+        price = float(price)
+        if price == price:
+            rsi.update(price, price, price)
+    return rsi.value
 
-def get_stock_data(ticker, days_back=365):
-    """從 Yahoo Finance 獲取股票數據"""
+def timed_download(chunk, fetch_from, end_date, deadline=None, **kwargs):
+    """呼叫資料來源並記錄每個代號的上游延遲與結果
+
+    deadline 為排程器放棄這個區塊的時間，交給 ResilientProvider 停止重試。
+    """
+    if isinstance(data_provider, ResilientProvider):
+        kwargs['deadline'] = deadline
+    start = time.perf_counter()
+    try:
+        frames = data_provider.download(chunk, fetch_from, end_date, **kwargs)
+    except Exception:
+        ERRORS.inc('upstream')
+        UPSTREAM_RESULTS.inc('error', amount=len(chunk))
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        for ticker in chunk:
+            # 清單外的代號合併成同一個標籤，避免任意 /api/stock/<x> 讓指標序列無限增加
+            UPSTREAM_LATENCY.observe(elapsed, ticker if ticker in UNIVERSE_TICKERS else 'other')
+    UPSTREAM_RESULTS.inc('ok', amount=len(frames))
+    UPSTREAM_RESULTS.inc('empty', amount=len(chunk) - len(frames))
+    return frames
+
+def fetch_frames(tickers, days_back=365):
+    """補齊本機歷史資料的尾端後，回傳最近 days_back 天的日線
+
+    需要抓取的代號依起始日期分組、切成區塊交由排程器併發下載；
+    已有歷史資料的代號只抓最後一筆之後的資料。回傳 FetchResult，
+    results 為 {ticker: DataFrame}；抓取逾時或失敗但本機仍有資料的代號
+    會以本機資料回傳，只有完全沒有資料的才列入逾時／失敗。
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days_back)
+
+    groups = {}
+    for ticker in tickers:
+        groups.setdefault(history_store.fetch_start(ticker, start_date), []).append(ticker)
+
+    chunks = {}
+    for fetch_from, group in groups.items():
+        for index, chunk in enumerate(chunked(group, BULK_CHUNK_SIZE)):
+            chunks[(fetch_from, index)] = chunk
+    jobs = {
+        key: (lambda deadline, chunk=chunk, fetch_from=key[0]:
+              timed_download(chunk, fetch_from, end_date, deadline))
+        for key, chunk in chunks.items()
+    }
+    with STAGE_LATENCY.time('upstream'):
+        outcome = fetch_scheduler.run(jobs)
+    for key in outcome.timed_out:
+        UPSTREAM_RESULTS.inc('timeout', amount=len(chunks[key]))
+
+    with STAGE_LATENCY.time('history_write'):
+        for (fetch_from, _), chunk_frames in outcome.results.items():
+            for ticker, df in chunk_frames.items():
+                history_store.append(ticker, df, fetch_from)
+
+    frames = {}
+    with STAGE_LATENCY.time('history_load'):
+        for ticker in tickers:
+            df = history_store.load(ticker, start=start_date)
+            if not df.empty:
+                frames[ticker] = df
+    timed_out = [t for key in outcome.timed_out for t in chunks[key] if t not in frames]
+    failed = [t for t in tickers if t not in frames and t not in timed_out]
+    return FetchResult(frames, timed_out, failed)
+
+def get_bulk_stock_data(tickers, days_back=365):
+    """批次獲取多個股票數據，results 為 {ticker: metrics}"""
+    print(f"正在批次獲取: {len(tickers)} 檔")
+    fetched = fetch_frames(tickers, days_back)
+
+    try:
+        with STAGE_LATENCY.time('compute'):
+            results = metrics_records(compute_metrics_matrix(close_matrix(fetched.results)))
+    except Exception as e:
+        ERRORS.inc('compute')
+        print(f"錯誤 (指標計算): {str(e)}")
+        results = {}
+    failed = list(fetched.failed) + [t for t in fetched.results if t not in results]
+    return FetchResult(results, fetched.timed_out, failed)
+
+def _fetch_and_store(keys):
+    """single-flight 的實際抓取：回傳 {(ticker, days_back): (狀態, metrics)}"""
+    days_back = keys[0][1]
+    fetched = get_bulk_stock_data([ticker for ticker, _ in keys], days_back)
+    now = datetime.now(MARKET_TZ)
+    for ticker, data in fetched.results.items():
+        quote_cache.set((ticker, days_back), data, ttl=ticker_ttl(ticker, now))
+    if days_back == 365:
+        listed = {t: data for t, data in fetched.results.items() if t in UNIVERSE_TICKERS}
+        last_ticker_refresh.update((ticker, now) for ticker in listed)
+        version, changed = snapshots.update(listed)
+        broadcaster.publish(version, changed)
+        if changed and SNAPSHOT_FILE:
+            save_snapshot()
+
+    outcome = {(t, days_back): ('ok', data) for t, data in fetched.results.items()}
+    outcome.update(((t, days_back), ('timeout', None)) for t in fetched.timed_out)
+    return outcome
+
+def save_snapshot():
+    try:
+        snapshots.save(SNAPSHOT_FILE)
+    except OSError as e:
+        print(f"錯誤 (儲存快照): {str(e)}")
+
+def collect_outcome(outcome, tickers, tag):
+    """把 single-flight 的 {(ticker, tag): (狀態, metrics)} 整理成 FetchResult"""
+    results, timed_out, failed = {}, [], []
+    for ticker in tickers:
+        status, data = outcome.get((ticker, tag), ('failed', None))
+        if status == 'ok':
+            results[ticker] = data
+        elif status == 'timeout':
+            timed_out.append(ticker)
+        else:
+            failed.append(ticker)
+    return FetchResult(results, timed_out, failed)
+
+def refresh_quotes(tickers, days_back=365):
+    """重新抓取並寫入快取；同時進行中的相同代號會共用同一次抓取"""
+    outcome = quote_flights.do_many([(t, days_back) for t in tickers], _fetch_and_store)
+    return collect_outcome(outcome, tickers, days_back)
+
+def _revalidate(keys):
+    if shared_cache is not None and not shared_state['leader']:
+        # follower 不自行抓取預設視窗，改讀 leader 發布的快照
+        sync_shared()
+        keys = [k for k in keys if k[1] != 365]
+    by_days = {}
+    for ticker, days_back in keys:
+        by_days.setdefault(days_back, []).append(ticker)
+    for days_back, tickers in by_days.items():
+        refresh_quotes(tickers, days_back)
+
+def get_cached_stock_data(tickers, days_back=365):
+    """先查快取，過期的在背景更新，查無的才同步抓取"""
+    results, stale, missing = {}, [], []
+    for ticker in tickers:
+        data, state = quote_cache.get((ticker, days_back))
+        if data is None:
+            missing.append(ticker)
+            continue
+        results[ticker] = data
+        if state == STALE:
+            stale.append((ticker, days_back))
+
+    if stale:
+        refresher.revalidate(stale, _revalidate)
+    if missing and days_back == 365 and shared_cache is not None and sync_shared():
+        for ticker in list(missing):
+            data, _ = quote_cache.get((ticker, days_back))
+            if data is not None:
+                results[ticker] = data
+                missing.remove(ticker)
+    if not missing:
+        return FetchResult(results, [], [])
+
+    fetched = refresh_quotes(missing, days_back)
+    results.update(fetched.results)
+    return FetchResult(results, fetched.timed_out, fetched.failed)
+
+def _fetch_intraday(keys):
+    """single-flight 的盤中抓取：回傳 {(ticker, 'intraday'): (狀態, metrics)}
+
+    已有分鐘線的代號從緩衝區最後一根所在的那天開始抓，重複的 K 棒由緩衝區略過；
+    第一次抓取往前多抓幾天，才有前一交易日的收盤價可算日漲跌。
+    """
+    now = datetime.now()
+    groups = {}
+    for ticker, _ in keys:
+        last = intraday_book.last_time(ticker)
+        start = (last.to_pydatetime() if last is not None else now - timedelta(days=5)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        groups.setdefault(start, []).append(ticker)
+
+    chunks = {}
+    for start, group in groups.items():
+        for index, chunk in enumerate(chunked(group, BULK_CHUNK_SIZE)):
+            chunks[(start, index)] = chunk
+    jobs = {
+        key: (lambda deadline, chunk=chunk, start=key[0]:
+              timed_download(chunk, start, now + timedelta(days=1), deadline, interval='1m'))
+        for key, chunk in chunks.items()
+    }
+    with STAGE_LATENCY.time('intraday_upstream'):
+        outcome = fetch_scheduler.run(jobs)
+
+    updated = {}
+    with STAGE_LATENCY.time('intraday_update'):
+        for chunk_frames in outcome.results.values():
+            for ticker, df in chunk_frames.items():
+                updated[ticker] = intraday_book.update(ticker, df)
+    timed_out = {t for key in outcome.timed_out for t in chunks[key]}
+
+    results = {}
+    for ticker, _ in keys:
+        # 這次沒抓到時沿用緩衝區中既有的分鐘線
+        data = updated.get(ticker) or intraday_book.metrics(ticker)
+        if data is not None:
+            quote_cache.set((ticker, 'intraday'), data, ttl=INTRADAY_TTL)
+            results[(ticker, 'intraday')] = ('ok', data)
+        elif ticker in timed_out:
+            results[(ticker, 'intraday')] = ('timeout', None)
+    return results
+
+def get_intraday_data(tickers):
+    """盤中指標：快取過期即同步增量更新（只抓新的分鐘線）"""
+    results, missing = {}, []
+    for ticker in tickers:
+        data, state = quote_cache.get((ticker, 'intraday'))
+        if data is None or state == STALE:
+            missing.append(ticker)
+        else:
+            results[ticker] = data
+    if not missing:
+        return FetchResult(results, [], [])
+
+    fetched = collect_outcome(
+        quote_flights.do_many([(t, 'intraday') for t in missing], _fetch_intraday), missing, 'intraday')
+    results.update(fetched.results)
+    return FetchResult(results, fetched.timed_out, fetched.failed)
+
+def all_tickers():
+    return universe.tickers()
+
+def ticker_ttl(ticker, now=None):
+    """快取 TTL 取所屬分類中最短的更新間隔；不在清單中的代號用預設值
+
+    休市中（收盤已超過 MARKET_CLOSE_GRACE 秒）抓到的資料在下次開盤前不會變動，TTL 延長到開盤。
+    """
+    intervals = [c.refresh_interval for c in universe.categories if ticker in c.tickers.values()]
+    ttl = min(intervals) if intervals else None
+    if MARKET_HOURS:
+        closed = closed_for(universe.asset_class(ticker), now, MARKET_CLOSE_GRACE)
+        if closed:
+            ttl = max(quote_cache.ttl if ttl is None else ttl, closed)
+    return ttl
+
+def market_refreshable(tickers, now=None):
+    """依交易時段篩出需要向上游更新的代號：市場開盤中，或收盤後還沒抓過收盤價"""
+    if not MARKET_HOURS:
+        return list(tickers)
+    now = now or datetime.now(MARKET_TZ)
+    refreshable = []
+    for ticker in tickers:
+        asset_class = universe.asset_class(ticker)
+        if needs_refresh(asset_class, last_ticker_refresh.get(ticker), now, MARKET_CLOSE_GRACE):
+            refreshable.append(ticker)
+        else:
+            REFRESH_SKIPPED.inc(asset_class)
+    return refreshable
+
+def ticker_info():
+    """{ticker: (名稱, 分類)}"""
+    return {
+        ticker: (name, category)
+        for category, tickers_dict in CATEGORIZED_TICKERS.items()
+        for name, ticker in tickers_dict.items()
+    }
+
+def describe(data):
+    """在 {ticker: metrics} 加上名稱與分類"""
+    info = ticker_info()
+    described = {}
+    for ticker, metrics in data.items():
+        name, category = info.get(ticker, (ticker, None))
+        described[ticker] = {'name': name, 'ticker': ticker, 'category': category, **metrics}
+    return described
+
+last_category_refresh = {}
+
+# ==================== 指標篩選 ====================
+# 依快照版本快取的排序索引，版本變動後第一次查詢時重建
+SCREEN_MAX_LIMIT = int(os.environ.get('SCREEN_MAX_LIMIT', 1000))
+screen_state = {'index': None, 'lock': threading.Lock()}
+
+def screen_index():
+    index = screen_state['index']
+    if index is not None and index.version == snapshots.version:
+        return index
+    with screen_state['lock']:
+        index = screen_state['index']
+        if index is None or index.version != snapshots.version:
+            version, data = snapshots.current()
+            # 只索引清單內的代號（舊的 snapshot.json 或共享快取中可能有其他代號）
+            data = {t: m for t, m in data.items() if t in UNIVERSE_TICKERS}
+            with STAGE_LATENCY.time('screen_index'):
+                index = ScreenIndex(version, data, METRIC_FIELDS,
+                                    {c: list(t.values()) for c, t in CATEGORIZED_TICKERS.items()})
+            screen_state['index'] = index
+    return index
+
+# ==================== 跨 worker 共享快取 ====================
+# SHARED_CACHE=sqlite|mmap|memory 時，只有取得租約的 leader 預熱並發布快照，
+# 其他 worker 讀取發布的快照；租約在 SHARED_LEASE_TTL 秒內沒有續約即可被接手
+shared_cache = create_shared()
+SHARED_LEASE_TTL = float(os.environ.get('SHARED_LEASE_TTL', 3 * universe.tick))
+shared_state = {'leader': False, 'version': None}
+
+def worker_id():
+    # 在呼叫時才取 pid：gunicorn --preload 會在匯入之後才 fork 出 worker
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+def sync_shared():
+    """讀取已發布的快照併入本機快照與快取；有新版本時回傳 True"""
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        
-        df = yf.download(ticker, start=start_date, end=end_date, progress=False)
-        
-        if df.empty:
-            return None
-        
-        # 獲取最新價格
-        current_price = df['Close'].iloc[-1]
-        
-        # 計算各時間段漲跌幅
-        day_change = ((df['Close'].iloc[-1] - df['Close'].iloc[-2]) / df['Close'].iloc[-2] * 100) if len(df) > 1 else 0
-        
-        week_ago_idx = max(0, len(df) - 5)
-        week_change = ((df['Close'].iloc[-1] - df['Close'].iloc[week_ago_idx]) / df['Close'].iloc[week_ago_idx] * 100) if len(df) > 5 else 0
-        
-        month_ago_idx = max(0, len(df) - 21)
-        month_change = ((df['Close'].iloc[-1] - df['Close'].iloc[month_ago_idx]) / df['Close'].iloc[month_ago_idx] * 100) if len(df) > 21 else 0
-        
-        year_change = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0] * 100) if len(df) > 0 else 0
-        
-        # 計算 RSI
-        rsi = calculate_rsi(df['Close'].values)
-        
-        return {
-            'price': float(current_price),
-            'day': float(day_change),
-            'week': float(week_change),
-            'month': float(month_change),
-            'ytd': float(year_change),
-            'rsi': float(rsi) if rsi else None
-        }
+        published = shared_cache.read(shared_state['version'])
     except Exception as e:
-        print(f"錯誤 ({ticker}): {str(e)}")
-        return None
+        print(f"錯誤 (讀取共享快取): {str(e)}")
+        return False
+    if published is None:
+        return False
+    version, data = published
+    shared_state['version'] = version
+    broadcaster.publish(*snapshots.merge(version, data))
+    for ticker, metrics in data.items():
+        quote_cache.set((ticker, 365), metrics, ttl=ticker_ttl(ticker))
+    return True
+
+def publish_shared():
+    version, data = snapshots.current()
+    if data and version != shared_state['version']:
+        try:
+            shared_cache.publish(version, data)
+            shared_state['version'] = version
+        except Exception as e:
+            print(f"錯誤 (發布共享快取): {str(e)}")
+
+# 背景預熱的固定間隔（秒）；未設定時依各分類的 refresh_interval
+REFRESH_INTERVAL = os.environ.get('REFRESH_INTERVAL')
+
+def warm_cache():
+    """背景預熱：依各分類的更新間隔，把到期的分類依優先順序更新
+
+    設定了 REFRESH_INTERVAL 時改以該間隔執行，每次更新所有分類（仍依優先順序）。
+    分類中休市且已有收盤後資料的代號略過（見 market_refreshable）。
+    啟用共享快取時只有 leader 預熱並發布，follower 只同步 leader 發布的快照。
+    """
+    if shared_cache is not None:
+        shared_state['leader'] = shared_cache.try_lead(worker_id(), SHARED_LEASE_TTL)
+        sync_shared()
+        if not shared_state['leader']:
+            return
+    # 沒有上次更新時間時每個分類都視為到期
+    last_refreshed = {} if REFRESH_INTERVAL is not None else last_category_refresh
+    for group in universe.due(time.monotonic(), last_refreshed):
+        tickers = market_refreshable(universe.tickers({c.name for c in group}))
+        if tickers:
+            refresh_quotes(tickers)
+        now = time.monotonic()
+        for c in group:
+            last_category_refresh[c.name] = now
+    if shared_cache is not None:
+        publish_shared()
+
+refresher = BackgroundRefresher(warm_cache, interval=float(
+    universe.tick if REFRESH_INTERVAL is None else REFRESH_INTERVAL))
+
+def get_stock_data(ticker, days_back=365):
+    """獲取單一股票數據（經由快取）"""
+    return get_cached_stock_data([ticker], days_back).results.get(ticker)
+
+def get_indicators(ticker, spec):
+    """以本機歷史資料增量計算指標；只讀取上次計算之後的 K 棒"""
+    last_date = indicator_engine.last_date(ticker, spec)
+    bars = history_store.load(ticker, start=last_date)
+    return indicator_engine.evaluate(ticker, spec, bars)
 
 # ==================== API 端點 ====================
 
-@app.route('/api/stocks', methods=['GET'])
-def get_all_stocks():
-    """獲取所有股票數據"""
+REGISTRY.gauge_callback(
+    'stock_cache_requests_total', '指標快取查詢結果', ('result',),
+    lambda: {(k,): v for k, v in quote_cache.stats().items() if k != 'entries'}, kind='counter')
+REGISTRY.gauge_callback(
+    'stock_cache_entries', '指標快取中的項目數', (), lambda: {(): len(quote_cache)})
+REGISTRY.gauge_callback(
+    'stock_singleflight_total', 'single-flight 呼叫統計（以代號計）', ('kind',),
+    lambda: {(k,): v for k, v in quote_flights.stats().items() if k != 'in_flight'}, kind='counter')
+REGISTRY.gauge_callback(
+    'stock_stream_subscribers', 'SSE 連線數', (), lambda: {(): broadcaster.subscriber_count})
+
+@app.before_request
+def start_background_refresh():
+    g.request_started = time.perf_counter()
+    if not refresher.running:
+        refresher.start()
+
+@app.after_request
+def record_request_latency(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+    return response
+
+def stale_headers(tickers):
+    """有代號仍是啟動時從檔案載入的舊值時，標示 stale 與快照的儲存時間"""
+    if not snapshots.stale_tickers(tickers):
+        return {}
+    saved_at = datetime.fromtimestamp(snapshots.saved_at or 0).isoformat(timespec='seconds')
+    return {'X-Snapshot-Stale': 'true', 'X-Snapshot-Saved-At': saved_at}
+
+def fetch_headers(fetched, daily=True):
+    """逾時或失敗的代號與快照版本以標頭列出，回應內容維持原本的結構"""
+    headers = {'X-Snapshot-Version': str(snapshots.version)}
+    if daily:
+        headers.update(stale_headers(fetched.results))
+    if fetched.timed_out:
+        headers['X-Timed-Out'] = ','.join(fetched.timed_out)
+    if fetched.failed:
+        headers['X-Failed'] = ','.join(fetched.failed)
+    return headers
+
+def stocks_since(version, fmt, fetched, tickers):
+    """/api/stocks?since= 的內容：只含該版本之後變動的代號"""
+    current, full, data = snapshots.since(version)
+    wanted = set(tickers)
+    stocks = describe({t: v for t, v in data.items() if t in wanted})
+    if fmt == 'columnar':
+        payload = columnar(list(stocks.values()), ['ticker', 'name', 'category', *METRIC_FIELDS])
+    else:
+        payload = {'stocks': stocks}
+    payload.update(version=current, full=full, stale=snapshots.stale_tickers(stocks),
+                   timed_out=fetched.timed_out, failed=fetched.failed)
+    return 200, payload, fetch_headers(fetched)
+
+def parse_categories(args):
+    """?category=分類[,分類]，回傳 (分類清單或 None, 未知的分類)"""
+    if not args.get('category'):
+        return None, []
+    categories = [c.strip() for c in args['category'].split(',') if c.strip()]
+    return categories, [c for c in categories if c not in universe]
+
+def stocks_view(args):
+    """/api/stocks 的內容，回傳 (status, payload, headers)；Flask 與 ASGI 共用
+
+    ?format=columnar 改為每個欄位一個陣列；?since=<版本> 只回傳該版本之後變動的代號；
+    ?category=分類[,分類] 只抓取並回傳指定分類；?mode=intraday 改回傳分鐘線的盤中指標。
+    """
+    fmt = args.get('format', 'nested')
+    if fmt not in ('nested', 'columnar'):
+        return 400, {'error': f'未知的格式: {fmt}'}, {}
+    mode = args.get('mode', 'daily')
+    if mode not in ('daily', 'intraday'):
+        return 400, {'error': f'未知的模式: {mode}'}, {}
+    since = args.get('since')
+    if since is not None and not since.isdigit():
+        return 400, {'error': 'since 必須為版本號'}, {}
+    if since is not None and mode == 'intraday':
+        return 400, {'error': 'since 只適用於日線模式'}, {}
+    categories, unknown = parse_categories(args)
+    if unknown:
+        return 404, {'error': f"未知的分類: {', '.join(unknown)}"}, {}
+
+    tickers = universe.tickers(categories)
+    daily = mode == 'daily'
+    fetched = get_cached_stock_data(tickers) if daily else get_intraday_data(tickers)
+    data = fetched.results
+    if since is not None:
+        return stocks_since(int(since), fmt, fetched, tickers)
+
     results = {}
-    
     for category, tickers_dict in CATEGORIZED_TICKERS.items():
+        if categories is not None and category not in categories:
+            continue
         results[category] = {}
-        
+
         for name, ticker in tickers_dict.items():
-            print(f"正在獲取: {ticker} ({name})")
-            data = get_stock_data(ticker)
-            
-            if data:
+            if ticker in data:
                 results[category][ticker] = {
                     'name': name,
                     'ticker': ticker,
                     'category': category,
-                    **data
+                    **data[ticker]
                 }
-    
-    return jsonify(results)
+
+    headers = fetch_headers(fetched, daily)
+    if fmt == 'columnar':
+        rows = [row for category in results.values() for row in category.values()]
+        payload = columnar(rows, ['ticker', 'name', 'category', *(METRIC_FIELDS if daily else INTRADAY_FIELDS)])
+        payload.update(stale=snapshots.stale_tickers(data) if daily else [],
+                       timed_out=fetched.timed_out, failed=fetched.failed)
+        return 200, payload, headers
+    return 200, results, headers
+
+def stock_view(ticker, args):
+    """/api/stock/<ticker> 的內容；?indicators=rsi,sma:50,macd 可附加（日線的）技術指標，
+    ?mode=intraday 改回傳盤中指標
+    """
+    spec = args.get('indicators')
+    if spec:
+        try:
+            parse_spec(spec)
+        except ValueError as e:
+            return 400, {'error': str(e)}, {}
+    mode = args.get('mode', 'daily')
+    if mode not in ('daily', 'intraday'):
+        return 400, {'error': f'未知的模式: {mode}'}, {}
+
+    if mode == 'intraday':
+        data, headers = get_intraday_data([ticker]).results.get(ticker), {}
+    else:
+        data, headers = get_stock_data(ticker), stale_headers([ticker])
+    if not data:
+        return 404, {'error': '無法獲取數據'}, {}
+    if spec:
+        data = {**data, 'indicators': get_indicators(ticker, spec.lower().replace(' ', ''))}
+    return 200, data, headers
+
+def history_view(ticker, args):
+    """/api/stock/<ticker>/history 的內容：降採樣後的 OHLC 欄位陣列
+
+    ?from=&to= 為 YYYY-MM-DD（預設最近一年），?points= 為最多點數，
+    ?method=lttb|minmax。資料讀自本機歷史資料庫，補齊尾端的抓取經由快取。
+    """
+    try:
+        end = datetime.strptime(args['to'], '%Y-%m-%d') if args.get('to') else datetime.now()
+        start = (datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from')
+                 else end - timedelta(days=365))
+        points = int(args.get('points', HISTORY_POINTS))
+    except ValueError:
+        return 400, {'error': 'from/to 須為 YYYY-MM-DD，points 須為整數'}, {}
+    method = args.get('method', 'lttb')
+    if method not in DOWNSAMPLE_METHODS:
+        return 400, {'error': f'未知的降採樣方法: {method}'}, {}
+    if start > end or not 2 <= points <= HISTORY_MAX_POINTS:
+        return 400, {'error': f'需 from <= to 且 2 <= points <= {HISTORY_MAX_POINTS}'}, {}
+
+    # 一年內的區間與 /api/stocks 共用同一個快取鍵，不會多打上游（以日期相減，
+    # 預設的「一年前的此刻」才會算成 365 而不是 366）
+    days_back = max(365, (date.today() - start.date()).days)
+    if not get_stock_data(ticker, days_back):
+        return 404, {'error': '無法獲取數據'}, {}
+
+    with STAGE_LATENCY.time('history_downsample'):
+        bars = history_store.load(ticker, start=start, end=end + timedelta(days=1))
+        sampled = downsample(bars, points, method)
+    payload = {
+        'ticker': ticker,
+        'from': start.strftime('%Y-%m-%d'),
+        'to': end.strftime('%Y-%m-%d'),
+        'method': method,
+        'total': len(bars),
+        'points': len(sampled),
+        'date': sampled.index.strftime('%Y-%m-%d').tolist(),
+    }
+    for column in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        payload[column.lower()] = np.round(sampled[column].to_numpy(dtype=float), 4).tolist()
+    return 200, payload, {}
+
+def correlation_view(args):
+    """/api/correlation 的內容：截至 ?date= 最近 ?window= 個交易日報酬率的相關係數矩陣
+
+    另附分類間（熱圖）的平均相關係數；?category= 可只計算指定分類。
+    未指定日期時以快照版本作為快取鍵的一部分，資料更新後自動重新計算。
+    """
+    try:
+        window = int(args.get('window', 60))
+        end = datetime.strptime(args['date'], '%Y-%m-%d') if args.get('date') else datetime.now()
+    except ValueError:
+        return 400, {'error': 'window 須為整數，date 須為 YYYY-MM-DD'}, {}
+    if not 2 <= window <= CORRELATION_MAX_WINDOW:
+        return 400, {'error': f'window 須介於 2 與 {CORRELATION_MAX_WINDOW} 之間'}, {}
+    categories, unknown = parse_categories(args)
+    if unknown:
+        return 404, {'error': f"未知的分類: {', '.join(unknown)}"}, {}
+
+    tickers = universe.tickers(categories)
+    # 以日曆天估算 window 個交易日，再多留一段緩衝
+    start = end - timedelta(days=window * 7 // 5 + 14)
+    fetched = get_cached_stock_data(tickers, max(365, (datetime.now() - start).days + 1))
+    key = (window, args.get('date') or f'v{snapshots.version}', tuple(categories or ()))
+    payload, _ = correlation_cache.get(key)
+    if payload is not None:
+        return 200, payload, fetch_headers(fetched)
+
+    with STAGE_LATENCY.time('correlation'):
+        frames = {}
+        for ticker in tickers:
+            df = history_store.load(ticker, start=start, end=end + timedelta(days=1))
+            if not df.empty:
+                frames[ticker] = df
+        close = close_matrix(frames)
+        returns = last_valid(returns_matrix(close), window)
+        corr = correlation_matrix(returns, min_periods=max(2, window // 2))
+
+        columns = {ticker: i for i, ticker in enumerate(close.columns)}
+        names = [c for c in CATEGORIZED_TICKERS if categories is None or c in categories]
+        groups = [[columns[t] for t in CATEGORIZED_TICKERS[c].values() if t in columns] for c in names]
+        sectors = group_average(corr, groups)
+
+    def rows(matrix):
+        return [[None if np.isnan(v) else v for v in row] for row in np.round(matrix, 4).tolist()]
+
+    payload = {
+        'window': window,
+        'date': close.index[-1].strftime('%Y-%m-%d') if len(close) else None,
+        'tickers': list(close.columns),
+        'matrix': rows(corr),
+        'sectors': {'categories': names, 'matrix': rows(sectors)},
+    }
+    correlation_cache.set(key, payload)
+    return 200, payload, fetch_headers(fetched)
+
+def backtest_view(args):
+    """/api/backtest 的內容：以本機歷史資料對所有代號一次回測，回傳淨值曲線與統計
+
+    ?rule=rsi（?period=&lower=&upper=）或 ?rule=sma（?fast=&slow=）；?from=&to= 為 YYYY-MM-DD
+    （預設最近 BACKTEST_YEARS 年），?cost= 為每次進出場的單邊成本（基點），?points= 為淨值曲線點數，
+    ?category= 可只回測指定分類。portfolio 為每日等權重持有各代號策略的組合。
+    未指定 to 時以快照版本作為快取鍵的一部分，資料更新後自動重新計算。
+    """
+    try:
+        rule, params = parse_rule(args)
+    except ValueError as e:
+        return 400, {'error': str(e)}, {}
+    try:
+        end = datetime.strptime(args['to'], '%Y-%m-%d') if args.get('to') else datetime.now()
+        start = (datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from')
+                 else end - timedelta(days=365 * BACKTEST_YEARS))
+        cost = float(args.get('cost', 0))
+        points = int(args.get('points', BACKTEST_POINTS))
+    except ValueError:
+        return 400, {'error': 'from/to 須為 YYYY-MM-DD，cost 須為數字，points 須為整數'}, {}
+    if start > end or (end - start).days > 366 * BACKTEST_MAX_YEARS:
+        return 400, {'error': f'需 from <= to 且區間不超過 {BACKTEST_MAX_YEARS} 年'}, {}
+    if not 0 <= cost <= 1000 or not 2 <= points <= HISTORY_MAX_POINTS:
+        return 400, {'error': f'需 0 <= cost <= 1000 且 2 <= points <= {HISTORY_MAX_POINTS}'}, {}
+    categories, unknown = parse_categories(args)
+    if unknown:
+        return 404, {'error': f"未知的分類: {', '.join(unknown)}"}, {}
+
+    tickers = universe.tickers(categories)
+    fetched = get_cached_stock_data(tickers, max(365, (datetime.now() - start).days + 1))
+    key = (rule, tuple(params.items()), start.strftime('%Y-%m-%d'), args.get('to') or f'v{snapshots.version}',
+           cost, points, tuple(categories or ()))
+    payload, _ = backtest_cache.get(key)
+    if payload is not None:
+        return 200, payload, fetch_headers(fetched)
+
+    with STAGE_LATENCY.time('backtest'):
+        frames = {}
+        for ticker in tickers:
+            df = history_store.load(ticker, start=start, end=end + timedelta(days=1))
+            if not df.empty:
+                frames[ticker] = df
+        close = close_matrix(frames)
+        if close.empty:
+            return 404, {'error': '無法獲取數據'}, {}
+        result = run_backtest(close, rule, params, cost / 10000)
+
+    sampled = np.union1d(bucket_starts(len(result.dates), points), [len(result.dates) - 1])
+
+    def numbers(values):
+        return [None if np.isnan(v) else v for v in np.round(np.asarray(values, dtype=float), 4).tolist()]
+
+    portfolio = {'equity': numbers(result.portfolio[sampled])}
+    portfolio.update(zip(BACKTEST_FIELDS, numbers([result.portfolio_stats[f] for f in BACKTEST_FIELDS])))
+    columns = {field: numbers(result.stats[field]) for field in BACKTEST_FIELDS}
+    equity = result.equity[sampled]
+    payload = {
+        'rule': rule,
+        'params': params,
+        'from': result.dates[0].strftime('%Y-%m-%d'),
+        'to': result.dates[-1].strftime('%Y-%m-%d'),
+        'cost': cost,
+        'days': len(result.dates),
+        'points': len(sampled),
+        'date': [result.dates[i].strftime('%Y-%m-%d') for i in sampled],
+        'portfolio': portfolio,
+        'tickers': {
+            ticker: {'equity': numbers(equity[:, i]), **{f: columns[f][i] for f in BACKTEST_FIELDS}}
+            for i, ticker in enumerate(result.tickers)
+        },
+    }
+    backtest_cache.set(key, payload)
+    return 200, payload, fetch_headers(fetched)
+
+def screen_view(args):
+    """/api/screen 的內容：依條件篩選並排序的代號
+
+    條件為 <欄位>_<lt|lte|gt|gte>=值（例如 rsi_lt=30、month_gt=5），可同時使用多個；
+    ?sort=欄位 與 ?order=desc|asc 排序，?limit= 限制筆數，?category= 限定分類，
+    ?format=columnar 改為每個欄位一個陣列。
+    """
+    try:
+        filters = parse_filters(args, METRIC_FIELDS)
+    except ValueError as e:
+        return 400, {'error': str(e)}, {}
+    try:
+        limit = int(args.get('limit', 50))
+    except ValueError:
+        return 400, {'error': 'limit 須為整數'}, {}
+    sort = args.get('sort')
+    if sort is not None and sort not in METRIC_FIELDS:
+        return 400, {'error': f'未知的排序欄位: {sort}'}, {}
+    order = args.get('order', 'desc')
+    if order not in ('desc', 'asc'):
+        return 400, {'error': f'未知的排序方向: {order}'}, {}
+    fmt = args.get('format', 'nested')
+    if fmt not in ('nested', 'columnar'):
+        return 400, {'error': f'未知的格式: {fmt}'}, {}
+    if not 1 <= limit <= SCREEN_MAX_LIMIT:
+        return 400, {'error': f'limit 須介於 1 與 {SCREEN_MAX_LIMIT} 之間'}, {}
+    categories, unknown = parse_categories(args)
+    if unknown:
+        return 404, {'error': f"未知的分類: {', '.join(unknown)}"}, {}
+
+    fetched = get_cached_stock_data(universe.tickers(categories))
+    index = screen_index()
+    with STAGE_LATENCY.time('screen_query'):
+        total, tickers = index.query(filters, sort, order == 'desc', limit, categories)
+    _, data = snapshots.current()
+    rows = list(describe({t: data[t] for t in tickers}).values())
+
+    if fmt == 'columnar':
+        payload = columnar(rows, ['ticker', 'name', 'category', *METRIC_FIELDS])
+    else:
+        payload = {'results': rows}
+    payload.update(version=index.version, total=total)
+    return 200, payload, fetch_headers(fetched)
+
+def health_view():
+    breakers = getattr(data_provider, 'breakers', {})
+    return {
+        'status': 'ok',
+        'singleflight': quote_flights.stats(),
+        'intraday': intraday_book.stats(),
+        'shared': None if shared_cache is None else {
+            'backend': shared_cache.name, 'leader': shared_state['leader'], 'version': shared_state['version']},
+        'markets': {c: is_open(c) for c in sorted({universe.asset_class(t) for t in universe.tickers()})},
+        'snapshot': {'version': snapshots.version,
+                     'stale': len(snapshots.stale_tickers(universe.tickers()))},
+        'upstream': {host: breaker.state for host, breaker in breakers.items()},
+    }
+
+@app.route('/api/stocks', methods=['GET'])
+def get_all_stocks():
+    """獲取所有股票數據"""
+    status, payload, headers = stocks_view(request.args)
+    return conditional_json(payload, status, headers)
 
 @app.route('/api/stock/<ticker>', methods=['GET'])
 def get_single_stock(ticker):
     """獲取單個股票數據"""
-    data = get_stock_data(ticker)
-    if data:
-        return jsonify(data)
-    return jsonify({'error': '無法獲取數據'}), 404
+    status, payload, headers = stock_view(ticker, request.args)
+    return conditional_json(payload, status, headers)
+
+@app.route('/api/stock/<ticker>/history', methods=['GET'])
+def get_stock_history(ticker):
+    """獲取降採樣後的歷史走勢"""
+    status, payload, headers = history_view(ticker, request.args)
+    return conditional_json(payload, status, headers)
+
+@app.route('/api/correlation', methods=['GET'])
+def get_correlation():
+    """獲取跨代號相關係數矩陣與分類熱圖"""
+    status, payload, headers = correlation_view(request.args)
+    return conditional_json(payload, status, headers)
+
+@app.route('/api/backtest', methods=['GET'])
+def backtest_stocks():
+    """以本機歷史資料回測交易規則"""
+    status, payload, headers = backtest_view(request.args)
+    return conditional_json(payload, status, headers)
+
+@app.route('/api/screen', methods=['GET'])
+def screen_stocks():
+    """依指標條件篩選代號"""
+    status, payload, headers = screen_view(request.args)
+    return conditional_json(payload, status, headers)
+
+@app.route('/api/stream', methods=['GET'])
+def stream_stocks():
+    """以 Server-Sent Events 推送有變動的代號指標"""
+    last_id = request.headers.get('Last-Event-ID', request.args.get('since'))
+    q = broadcaster.subscribe()
+    version, full, data = snapshots.since(int(last_id) if last_id and last_id.isdigit() else None)
+    response = Response(broadcaster.events(q, version, data, describe, full=full),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus 格式的延遲、快取與錯誤統計"""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok'})
+    return jsonify(health_view())
+
+@app.errorhandler(500)
+def internal_error(e):
+    """未預期的例外以 JSON 回應，與 ASGI 模式相同"""
+    ERRORS.inc('view')
+    return jsonify(INTERNAL_ERROR), 500
 
 if __name__ == '__main__':
     # 改為監聽所有 IP 和 Render 指定的端口
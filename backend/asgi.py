@@ -0,0 +1,234 @@
+"""ASGI 服務模式
+
+與 Flask 路由共用 app.py 的快取、排程與回應內容，但以非同步方式處理請求：
+阻塞的上游抓取與指標計算交給有上限的執行緒池，事件迴圈本身不會被卡住，
+一個緩慢的 yf.download 只佔用一條背景執行緒而不是整個 worker。
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+不依賴任何 ASGI 框架；提供 /api/stocks、/api/stock/<ticker>、/api/stock/<ticker>/history、
+/api/correlation、/api/screen、/api/backtest、/api/stream、/api/metrics 與 /api/health。
+"""
+import asyncio
+import json
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import app as backend
+from responses import encode_json, parse_if_none_match
+from stream import format_event
+from telemetry import CONTENT_TYPE, ERRORS, REGISTRY, REQUEST_LATENCY
+
+# 同時執行阻塞工作（抓取、計算）的執行緒數量
+ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', 32))
+
+SSE_POLL_INTERVAL = 0.25
+
+# 與 Flask 的 CORS 設定相同，讓跨來源的前端讀得到自訂標頭
+EXPOSE_HEADERS = ', '.join(backend.EXPOSED_HEADERS).encode('latin-1')
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_WORKER_THREADS, thread_name_prefix='asgi')
+
+
+async def run_blocking(fn, *args):
+    """在執行緒池中執行阻塞函式"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+def _headers(scope):
+    return {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+
+
+async def send_response(send, status, body, headers):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin-1'), str(v).encode('latin-1')) for k, v in headers.items()]
+        + [(b'access-control-allow-origin', b'*'),
+           (b'access-control-expose-headers', EXPOSE_HEADERS)],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, request_headers, status, payload, headers=None):
+    status, body, extra = encode_json(
+        payload, status,
+        accept_encoding=request_headers.get('accept-encoding'),
+        if_none_match=parse_if_none_match(request_headers.get('if-none-match')),
+    )
+    await send_response(send, status, body, {**extra, **(headers or {})})
+
+
+async def stream_events(scope, receive, send, request_headers, args):
+    """SSE：輪詢 Broadcaster 佇列，等待時不佔用執行緒"""
+    last_id = request_headers.get('last-event-id', args.get('since'))
+    q = backend.broadcaster.subscribe()
+    version, full, data = backend.snapshots.since(
+        int(last_id) if last_id and last_id.isdigit() else None)
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                    (b'access-control-allow-origin', b'*')],
+    })
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        event = format_event('snapshot' if full else 'update', backend.describe(data), version)
+        await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        idle = 0.0
+        while not disconnected.is_set():
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(SSE_POLL_INTERVAL)
+                idle += SSE_POLL_INTERVAL
+                if idle >= 15:
+                    idle = 0.0
+                    await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                continue
+            idle = 0.0
+            if item is None:
+                break
+            item_version, changed = item
+            if item_version <= version:
+                continue
+            event = format_event('update', backend.describe(changed), item_version)
+            await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        if not disconnected.is_set():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+        backend.broadcaster.unsubscribe(q)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            backend.refresher.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            backend.refresher.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    started = time.perf_counter()
+    status = {}
+    head = scope['method'] == 'HEAD'
+
+    async def send_and_record(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+        elif head:
+            # HEAD 只回標頭，內容與 GET 相同但不送出
+            message = {**message, 'body': b''}
+        await send(message)
+
+    try:
+        await dispatch(scope, receive, send_and_record)
+    except Exception as e:
+        # 與 Flask 相同：未預期的例外回 JSON 500（回應已開始送出時只能中斷連線）
+        print(f"錯誤 ({scope['method']} {scope['path']}): {str(e)}")
+        ERRORS.inc('view')
+        if 'code' in status:
+            raise
+        await send_json(send_and_record, _headers(scope), 500, backend.INTERNAL_ERROR)
+    finally:
+        if scope['path'] != '/api/stream':
+            REQUEST_LATENCY.observe(time.perf_counter() - started, scope['method'],
+                                    route_label(scope['path']), str(status.get('code', 500)))
+
+
+def stock_route(path):
+    """/api/stock/<ticker>[/history] 的 (代號, 是否為 history)；其他路徑為 None
+
+    與 Flask 的路由規則相同，代號不可為空（/api/stock/ 為 404）。
+    """
+    parts = path.split('/')
+    if parts[:3] != ['', 'api', 'stock'] or len(parts) not in (4, 5) or not parts[3]:
+        return None
+    if len(parts) == 5 and parts[4] != 'history':
+        return None
+    return parts[3], len(parts) == 5
+
+
+def route_label(path):
+    """與 Flask 的路由規則使用相同的標籤"""
+    stock = stock_route(path)
+    if stock is not None:
+        return '/api/stock/<ticker>/history' if stock[1] else '/api/stock/<ticker>'
+    if path in ('/api/health', '/api/stocks', '/api/stream', '/api/metrics', '/api/correlation', '/api/screen',
+                '/api/backtest'):
+        return path
+    return 'unmatched'
+
+
+async def dispatch(scope, receive, send):
+
+    request_headers = _headers(scope)
+    args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+    path = scope['path']
+
+    if scope['method'] == 'OPTIONS':
+        await send_response(send, 204, b'', {
+            'Access-Control-Allow-Methods': 'GET, OPTIONS',
+            'Access-Control-Allow-Headers': request_headers.get('access-control-request-headers', '*'),
+        })
+        return
+    if scope['method'] not in ('GET', 'HEAD'):
+        await send_json(send, request_headers, 405, {'error': '不支援的方法'})
+        return
+
+    stock = stock_route(path)
+    if path == '/api/health':
+        await send_json(send, request_headers, 200, backend.health_view())
+    elif path == '/api/metrics':
+        await send_response(send, 200, REGISTRY.render().encode('utf-8'), {'Content-Type': CONTENT_TYPE})
+    elif path == '/api/stocks':
+        status, payload, headers = await run_blocking(backend.stocks_view, args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif stock is not None and not stock[1]:
+        status, payload, headers = await run_blocking(backend.stock_view, stock[0], args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif stock is not None:
+        status, payload, headers = await run_blocking(backend.history_view, stock[0], args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif path == '/api/screen':
+        status, payload, headers = await run_blocking(backend.screen_view, args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif path == '/api/backtest':
+        status, payload, headers = await run_blocking(backend.backtest_view, args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif path == '/api/correlation':
+        status, payload, headers = await run_blocking(backend.correlation_view, args)
+        await send_json(send, request_headers, status, payload, headers)
+    elif path == '/api/stream' and scope['method'] == 'HEAD':
+        await send_response(send, 200, b'', {'Content-Type': 'text/event-stream; charset=utf-8',
+                                             'Cache-Control': 'no-cache'})
+    elif path == '/api/stream':
+        await stream_events(scope, receive, send, request_headers, args)
+    else:
+        await send_response(send, 404, json.dumps({'error': '找不到路徑'}).encode('utf-8'),
+                            {'Content-Type': 'application/json'})
@@ -0,0 +1,184 @@
+"""向量化回測
+
+輸入為對齊後的收盤價矩陣（列為日期、欄為代號，缺值為 NaN），所有代號的規則、部位、
+報酬與統計都以矩陣運算一次算出，不逐檔迴圈：
+
+- rsi：RSI 低於 lower 時進場、高於 upper 時出場，其餘日子維持原部位
+- sma：快線（fast 日均線）在慢線（slow 日均線）之上時持有
+
+指標以各代號自己的有效資料計算（與 metrics 相同，先把有效值往下對齊再算，算完放回原位），
+加密貨幣週末的報價不會讓股票多出零漲跌的日子。訊號以當日收盤價判斷、隔一個交易日才生效，
+避免用到未來資料；報酬率以各自前一筆有效收盤價計算，該代號沒有報價的日子報酬為 0。
+"""
+from typing import NamedTuple
+
+from correlation import returns_matrix
+from lazy import LazyModule
+from metrics import rsi_history
+
+np = LazyModule('numpy')
+
+DAYS_PER_YEAR = 365.25
+
+# 規則: {參數: 預設值}
+RULES = {
+    'rsi': {'period': 14, 'lower': 30.0, 'upper': 70.0},
+    'sma': {'fast': 50, 'slow': 200},
+}
+STAT_FIELDS = ['total_return', 'cagr', 'sharpe', 'max_drawdown', 'trades', 'exposure', 'buy_hold']
+
+
+class BacktestResult(NamedTuple):
+    dates: list
+    tickers: list
+    equity: object  # (日期, 代號) 的淨值，起始為 1
+    portfolio: object  # 每日等權重再平衡的組合淨值
+    stats: dict  # {欄位: 每個代號一個值的陣列}
+    portfolio_stats: dict
+
+
+def parse_rule(args):
+    """從查詢參數取出 (規則, {參數: 值})；未知規則或參數不合理時拋出 ValueError"""
+    rule = args.get('rule', 'rsi')
+    if rule not in RULES:
+        raise ValueError(f"未知的規則: {rule}")
+    params = {}
+    for name, default in RULES[rule].items():
+        kind = type(default)
+        try:
+            params[name] = kind(args.get(name, default))
+        except ValueError:
+            raise ValueError(f"{name} 必須為{'整數' if kind is int else '數字'}") from None
+    if rule == 'rsi':
+        if params['period'] < 2:
+            raise ValueError("period 必須至少為 2")
+        if not 0 <= params['lower'] < params['upper'] <= 100:
+            raise ValueError("需 0 <= lower < upper <= 100")
+    elif not 1 <= params['fast'] < params['slow']:
+        raise ValueError("需 1 <= fast < slow")
+    return rule, params
+
+
+def _own_bars(values, compute):
+    """以每欄自己的有效資料計算 compute(packed, counts)，再放回原本的日期位置
+
+    compute 可回傳多個與 packed 同形狀的矩陣（tuple），只需排序一次。
+    """
+    valid = ~np.isnan(values)
+    order = np.argsort(valid, axis=0, kind='stable')
+    packed = np.take_along_axis(values, order, axis=0)
+    computed = compute(packed, valid.sum(axis=0))
+    results = []
+    for matrix in (computed if isinstance(computed, tuple) else (computed,)):
+        out = np.empty_like(values)
+        np.put_along_axis(out, order, matrix, axis=0)
+        results.append(out)
+    return tuple(results) if isinstance(computed, tuple) else results[0]
+
+
+def _rolling_mean(packed, counts, window):
+    """往下對齊後的移動平均；該欄累積不足 window 筆的位置為 NaN"""
+    rows, cols = packed.shape
+    csum = np.vstack([np.zeros((1, cols)), np.cumsum(np.nan_to_num(packed), axis=0)])
+    out = np.full(packed.shape, np.nan)
+    if window <= rows:
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    have = np.arange(rows)[:, None] - (rows - counts)[None, :] + 1
+    return np.where(have >= window, out, np.nan)
+
+
+def _hold(enter, leave):
+    """進場日為 1、出場日為 0，其餘日子沿用前一個狀態（向量化的 forward fill），起始為 0"""
+    rows, cols = enter.shape
+    state = np.where(enter, 1.0, np.where(leave, 0.0, np.nan))
+    last = np.where(~np.isnan(state), np.arange(rows)[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    held = state[last, np.arange(cols)]
+    return np.nan_to_num(held, nan=0.0)
+
+
+def signals(values, rule, params):
+    """以各日收盤後的資料決定的目標部位（0 或 1），形狀與 values 相同"""
+    values = np.asarray(values, dtype=float)
+    if rule == 'rsi':
+        rsi = _own_bars(values, lambda p, c: rsi_history(p, c, params['period']))
+        with np.errstate(invalid='ignore'):
+            return _hold(rsi < params['lower'], rsi > params['upper'])
+    fast, slow = _own_bars(values, lambda p, c: (_rolling_mean(p, c, params['fast']),
+                                                 _rolling_mean(p, c, params['slow'])))
+    with np.errstate(invalid='ignore'):
+        target = (fast > slow).astype(float)
+    # 均線尚未成形或當天沒有報價時沿用前一天的部位
+    return _hold(target == 1, (target == 0) & ~np.isnan(slow))
+
+
+def _drawdown(equity):
+    return (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+
+
+def _stats(returns, listed, position, years):
+    """每欄的統計；returns 為策略日報酬（未上市的日子為 0），listed 為有報酬率的日子，
+    years 為各欄第一筆到最後一筆報價相隔的年數（年化時每年的筆數依各欄自己的交易日計算，
+    加密貨幣一年約 365 筆、股票約 252 筆）
+    """
+    days = listed.sum(axis=0)
+    equity = np.cumprod(1 + returns, axis=0)
+    final = equity[-1] if len(equity) else np.ones(returns.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(years > 0, final ** (1 / years) - 1, np.nan)
+        mean = returns.sum(axis=0) / days
+        var = np.where(listed, (returns - mean) ** 2, 0).sum(axis=0) / (days - 1)
+        sharpe = np.where(var > 0, mean / np.sqrt(var) * np.sqrt(days / years), np.nan)
+        exposure = np.where(listed, position, 0).sum(axis=0) / days
+    entries = np.diff(position, axis=0, prepend=0) > 0
+    return equity, {
+        'total_return': (final - 1) * 100,
+        'cagr': cagr * 100,
+        'sharpe': sharpe,
+        'max_drawdown': _drawdown(equity) * 100 if len(equity) else np.zeros(returns.shape[1]),
+        'trades': entries.sum(axis=0).astype(float),
+        'exposure': exposure * 100,
+    }
+
+
+def _valid_range(values):
+    """每欄第一筆與最後一筆有效值的列索引"""
+    valid = ~np.isnan(values)
+    return np.argmax(valid, axis=0), len(values) - 1 - np.argmax(valid[::-1], axis=0)
+
+
+def run_backtest(close, rule, params, cost=0.0):
+    """對 close 的所有代號執行規則；cost 為每次進出場的單邊成本（比例，例如 0.001）"""
+    values = close.to_numpy(dtype=float)
+    target = signals(values, rule, params)
+    # 收盤時決定的部位隔一個交易日才生效
+    position = np.vstack([np.zeros((1, values.shape[1])), target[:-1]])
+    asset = returns_matrix(close)
+    listed = ~np.isnan(asset)
+    returns = position * np.nan_to_num(asset)
+    returns -= cost * np.abs(np.diff(position, axis=0, prepend=0))
+
+    day = close.index.values.astype('datetime64[D]').astype(np.int64)
+    first, last = _valid_range(values)
+    years = (day[last] - day[first]) / DAYS_PER_YEAR
+    equity, stats = _stats(returns, listed, position, years)
+    cols = np.arange(values.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['buy_hold'] = (values[last, cols] / values[first, cols] - 1) * 100
+
+    # 組合：每日等權重持有當天有報價的代號（每日再平衡）
+    count = listed.sum(axis=1)
+    active = (count > 0)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(active[:, 0], returns.sum(axis=1) / count, 0.0)[:, None]
+        held = np.where(active[:, 0], (position * listed).sum(axis=1) / count, 0.0)[:, None]
+        benchmark = np.where(active[:, 0], np.nansum(asset, axis=1) / count, 0.0)
+    span = (day[last.max()] - day[first.min()]) / DAYS_PER_YEAR
+    portfolio, portfolio_stats = _stats(daily, active, held, np.array([span]))
+    portfolio_stats['trades'] = stats['trades'].sum(keepdims=True)
+    portfolio_stats['buy_hold'] = (np.prod(1 + benchmark, keepdims=True) - 1) * 100
+
+    return BacktestResult(
+        dates=list(close.index), tickers=list(close.columns), equity=equity, portfolio=portfolio[:, 0],
+        stats=stats, portfolio_stats={k: float(v[0]) for k, v in portfolio_stats.items()},
+    )
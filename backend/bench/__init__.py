@@ -0,0 +1,13 @@
+"""後端效能基準測試
+
+請在 backend/ 目錄下以模組方式執行，例如：
+
+    python -m bench.bench_metrics
+    python -m bench.bench_correlation
+    python -m bench.bench_screen
+    python -m bench.bench_backtest
+    python -m bench.bench_import
+    python -m bench.run --latency 0.05 --failure-rate 0.02
+
+bench.run 的結果寫在 bench/results/，可用 --compare 與先前的結果比較。
+"""
@@ -0,0 +1,79 @@
+"""向量化回測的成本
+
+以合成的收盤價（預設 10 年、約 2520 個交易日）比較 backtest.run_backtest 與逐檔、
+逐日以串流指標（indicators.WilderRSI、SMA）模擬的寫法，並確認兩者的總報酬與交易次數一致。
+
+    python -m bench.bench_backtest [--sizes 40 500] [--years 10] [--rule rsi|sma]
+"""
+import argparse
+
+import numpy as np
+
+from backtest import RULES, run_backtest
+from bench.bench_metrics import best_of, synthetic_close
+from indicators import SMA, WilderRSI
+
+COST = 0.001
+
+
+def loop_backtest(close, rule, params, cost=COST):
+    """逐檔逐日的回測：當天收盤決定部位，下一筆才生效；回傳 {ticker: (總報酬 %, 交易次數)}"""
+    results = {}
+    for ticker in close.columns:
+        prices = close[ticker].dropna().to_numpy()
+        if rule == 'rsi':
+            rsi = WilderRSI(params['period'])
+        else:
+            fast, slow = SMA(params['fast']), SMA(params['slow'])
+        equity, held, target, trades, prev = 1.0, 0, 0, 0, None
+        for price in prices:
+            if prev is not None:
+                trades += target > held
+                change, held = abs(target - held), target
+                equity *= 1 + held * (price / prev - 1) - cost * change
+            prev = price
+            if rule == 'rsi':
+                value = rsi.update(price, price, price)
+                if value is not None and value < params['lower']:
+                    target = 1
+                elif value is not None and value > params['upper']:
+                    target = 0
+            else:
+                f, s = fast.push(price), slow.push(price)
+                if s is not None:
+                    target = int(f > s)
+        results[ticker] = ((equity - 1) * 100, trades)
+    return results
+
+
+def vector_results(result):
+    return {t: (result.stats['total_return'][i], result.stats['trades'][i])
+            for i, t in enumerate(result.tickers)}
+
+
+def same(a, b):
+    return a.keys() == b.keys() and all(
+        np.isclose(a[t][0], b[t][0], rtol=1e-6) and a[t][1] == b[t][1] for t in a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 500])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--rule', choices=list(RULES), default='rsi')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    params = dict(RULES[args.rule])
+
+    print(f"規則 {args.rule} {params}，{args.years} 年")
+    print(f"{'代號數':>8} {'向量化(ms)':>12} {'逐檔(ms)':>12} {'檔/秒':>12} {'加速':>8}  一致")
+    for n in args.sizes:
+        close = synthetic_close(n, args.years * 252)
+        vec_time, result = best_of(lambda: run_backtest(close, args.rule, params, COST), args.repeat)
+        loop_time, expected = best_of(lambda: loop_backtest(close, args.rule, params), 1)
+        print(f"{n:>8} {vec_time * 1000:>12.1f} {loop_time * 1000:>12.1f} "
+              f"{n / vec_time:>12,.0f} {loop_time / vec_time:>7.1f}x  {same(vector_results(result), expected)}")
+
+
+if __name__ == '__main__':
+    main()
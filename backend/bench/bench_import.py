@@ -0,0 +1,91 @@
+"""啟動時間：匯入 app 與第一個 /api/health 回應要多久
+
+每次量測都開新的 Python 行程（模組快取只在行程內有效）。以 -X importtime 的輸出
+列出 app 直接匯入的模組中最慢的幾個，並確認 numpy、pandas、yfinance 沒有在啟動時載入。
+
+    python -m bench.bench_import [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pandas', 'yfinance')
+
+# 各段量測的程式；最後一行印出經過的秒數
+SCRIPTS = {
+    'import_app': 'import app',
+    'first_health': "import app; app.app.test_client().get('/api/health')",
+    'data_stack': "import app, numpy, pandas, yfinance",
+}
+TIMER = "import time; _t = time.perf_counter()\n{body}\nprint(time.perf_counter() - _t)"
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+
+def _env():
+    env = dict(os.environ, DATA_PROVIDER='fake', HISTORY_DB=':memory:', SNAPSHOT_FILE='',
+               REFRESH_INTERVAL='0', PYTHONWARNINGS='ignore')
+    return env
+
+
+def timed(body):
+    """在新行程中執行 body，回傳經過的秒數"""
+    out = subprocess.run([sys.executable, '-c', TIMER.format(body=body)], cwd=BACKEND_DIR,
+                         env=_env(), capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def importtime(target='app'):
+    """-X importtime 的結果：[(模組, 自身微秒, 累計微秒, 深度)]"""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+                         cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, total, indent, name = match.groups()
+            rows.append((name, int(own), int(total), (len(indent) - 1) // 2))
+    return rows
+
+
+def import_report(repeat=5):
+    """{量測名稱: 毫秒統計}，格式與 bench.run 的結果相同"""
+    report = {}
+    for name, body in SCRIPTS.items():
+        samples = sorted(timed(body) * 1000 for _ in range(repeat))
+        report[name] = {
+            'n': repeat,
+            'mean_ms': statistics.fmean(samples),
+            'p50_ms': samples[len(samples) // 2],
+            'p95_ms': samples[-1],
+            'min_ms': samples[0],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    for name, result in import_report(args.repeat).items():
+        print(f"{name:<16} p50={result['p50_ms']:.1f}ms  min={result['min_ms']:.1f}ms")
+
+    rows = importtime()
+    app_total = next(total for name, _, total, depth in rows if name == 'app' and depth == 0)
+    print(f"\n-X importtime：app 累計 {app_total / 1000:.1f}ms，直接匯入中最慢的 {args.top} 個：")
+    direct = sorted((r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True)
+    for name, own, total, _ in direct[:args.top]:
+        print(f"  {name:<24} 累計 {total / 1000:>8.1f}ms  自身 {own / 1000:>6.1f}ms")
+
+    eager = [m for m in HEAVY_MODULES if any(name == m for name, *_ in rows)]
+    print(f"\n啟動時載入的資料層模組：{', '.join(eager) if eager else '無'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""篩選查詢的成本
+
+以合成的指標資料比較 screen.ScreenIndex（預先排序、searchsorted）與逐檔比較後排序的寫法，
+量測建立索引與單次查詢的時間，並確認兩者結果一致。
+
+    python -m bench.bench_screen [--sizes 40 500 5000]
+"""
+import argparse
+
+import numpy as np
+
+from bench.bench_metrics import best_of
+from metrics import METRIC_FIELDS
+from screen import ScreenIndex
+
+FILTERS = [('rsi', 'lt', 40.0), ('month', 'gt', 0.0)]
+SORT = 'month'
+
+
+def synthetic_metrics(n, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n):
+        data[f'T{i:05d}'] = {
+            'price': float(rng.uniform(5, 500)),
+            'day': float(rng.normal(0, 1.5)),
+            'week': float(rng.normal(0, 3)),
+            'month': float(rng.normal(0, 6)),
+            'ytd': float(rng.normal(5, 20)),
+            'rsi': None if rng.random() < 0.02 else float(rng.uniform(0, 100)),
+        }
+    return data
+
+
+def naive_query(data, limit):
+    ops = {'lt': lambda a, b: a < b, 'gt': lambda a, b: a > b}
+    matched = [t for t, m in data.items()
+               if all(m[f] is not None and ops[op](m[f], v) for f, op, v in FILTERS)]
+    matched.sort(key=lambda t: data[t][SORT], reverse=True)
+    return len(matched), matched[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 500, 5000])
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'代號數':>8} {'建索引':>10} {'查詢':>10} {'逐檔':>10} {'加速':>8}  結果一致")
+    for size in args.sizes:
+        data = synthetic_metrics(size)
+        build_time, index = best_of(lambda: ScreenIndex(1, data, METRIC_FIELDS), args.repeat)
+        query_time, result = best_of(lambda: index.query(FILTERS, SORT, True, args.limit), args.repeat)
+        naive_time, expected = best_of(lambda: naive_query(data, args.limit), args.repeat)
+        print(f"{size:>8} {build_time * 1000:>8.2f}ms {query_time * 1000:>8.3f}ms "
+              f"{naive_time * 1000:>8.3f}ms {naive_time / query_time:>7.1f}x  {'是' if result == expected else '否'}")
+
+
+if __name__ == '__main__':
+    main()
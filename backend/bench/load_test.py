@@ -0,0 +1,103 @@
+"""HTTP 壓力測試：在不同併發數下量測延遲與每秒請求數
+
+對已啟動的伺服器送出請求（Flask 或 ASGI 皆可），例如在 backend/ 下：
+
+    DATA_PROVIDER=fake python app.py                        # Flask，port 5000
+    DATA_PROVIDER=fake uvicorn asgi:app --port 8000         # ASGI
+    python -m bench.load_test --url http://127.0.0.1:8000 --concurrency 1 10 50
+
+只使用標準函式庫的 asyncio 連線，每個請求一條連線（Connection: close）。
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host, port, path, timeout):
+    """送出一個 GET，回傳 (狀態碼, 秒數)；失敗時狀態碼為 0"""
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+        status = int(data.split(b' ', 2)[1]) if data.startswith(b'HTTP/') else 0
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_level(host, port, path, concurrency, total, timeout):
+    pending = iter(range(total))
+    results = []
+
+    async def worker():
+        for _ in pending:
+            results.append(await fetch(host, port, path, timeout))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [t for status, t in results if status == 200 or status == 304]
+    return {
+        'path': path,
+        'concurrency': concurrency,
+        'requests': total,
+        'ok': len(latencies),
+        'errors': total - len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def main_async(args):
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+
+    # 先暖身一次，避免把第一次抓取計入
+    for path in args.paths:
+        await fetch(host, port, path, args.timeout)
+
+    rows = []
+    for path in args.paths:
+        for concurrency in args.concurrency:
+            total = max(args.requests, concurrency)
+            rows.append(await run_level(host, port, path, concurrency, total, args.timeout))
+            r = rows[-1]
+            print(f"{r['path']:<22} c={r['concurrency']:<4} ok={r['ok']:<5} err={r['errors']:<4} "
+                  f"{r['rps']:>8.1f} req/s  p50={r['p50_ms']:.1f}ms  p95={r['p95_ms']:.1f}ms  "
+                  f"p99={r['p99_ms']:.1f}ms")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--paths', nargs='+', default=['/api/stocks', '/api/stock/AAPL'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--output', help='把結果寫成 JSON')
+    args = parser.parse_args()
+
+    rows = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""後端基準測試套件
+
+以決定性的 FakeProvider（可設定延遲與失敗率）取代 Yahoo，量測：
+
+- /api/stocks 端到端延遲（冷啟動：快取與歷史資料皆空；熱：快取命中）
+- N 個併發客戶端下的吞吐量（快取命中與每次都重新計算兩種情境）
+- get_stock_data、calculate_rsi、compute_metrics_matrix 的單次成本
+- 啟動時間：匯入 app、第一個 /api/health 回應、載入完整資料層（見 bench.bench_import）
+
+結果存成 JSON，可與之前的結果比較找出退步：
+
+    python -m bench.run --latency 0.05 --failure-rate 0.02 --output bench/results/now.json
+    python -m bench.run --compare bench/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+from bench.bench_import import import_report
+
+
+def stats(samples):
+    """把每次耗時（秒）整理成毫秒統計"""
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'min_ms': ordered[0] * 1000,
+    }
+
+
+def measure(fn, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return stats(samples)
+
+
+def throughput(fn, clients, requests_per_client):
+    """clients 條執行緒各呼叫 fn 若干次，回傳每秒次數與延遲"""
+    samples, lock = [], threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            fn()
+            local.append(time.perf_counter() - start)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {'clients': clients, 'rps': len(samples) / elapsed, **stats(samples)}
+
+
+def load_backend(args):
+    """設定環境變數後才載入 app，讓模組層級的設定讀到壓測用的值"""
+    os.environ.update({
+        'DATA_PROVIDER': 'fake',
+        'HISTORY_DB': ':memory:',
+        'SNAPSHOT_FILE': '',
+        'REFRESH_INTERVAL': '0',
+        'UPSTREAM_RATE': '100000',
+        'UPSTREAM_BURST': '100000',
+        'UPSTREAM_BACKOFF_BASE': '0.01',
+    })
+    import app as backend
+    return backend
+
+
+def run_suite(args):
+    backend = load_backend(args)
+    from history import HistoryStore
+    from metrics import close_matrix, compute_metrics_matrix
+    from providers import FakeProvider
+
+    def reset():
+        backend.set_provider(FakeProvider(latency=args.latency, failure_rate=args.failure_rate,
+                                          seed=args.seed))
+        backend.history_store = HistoryStore(':memory:')
+        backend.quote_cache.clear()
+
+    client = backend.app.test_client()
+
+    def get_stocks():
+        client.get('/api/stocks')
+
+    results = import_report(args.import_repeat) if args.import_repeat > 0 else {}
+    reset()
+    results['stocks_cold'] = measure(get_stocks, args.cold_repeat, before=reset)
+    results['stocks_warm'] = measure(get_stocks, args.repeat)
+
+    for clients in args.clients:
+        results[f'throughput_warm_c{clients}'] = throughput(
+            lambda: backend.app.test_client().get('/api/stocks'), clients, args.requests)
+
+    # 每次請求前清空快取：走 single-flight、歷史資料讀取與指標計算，但不重新下載整年資料
+    def uncached():
+        backend.quote_cache.clear()
+        backend.app.test_client().get('/api/stocks')
+
+    for clients in args.clients:
+        results[f'throughput_uncached_c{clients}'] = throughput(
+            uncached, clients, max(1, args.requests // 10))
+
+    reset()
+    backend.get_bulk_stock_data(backend.all_tickers())
+    results['get_stock_data'] = measure(
+        lambda: backend.get_stock_data('AAPL'), args.repeat, before=backend.quote_cache.clear)
+
+    frames = backend.fetch_frames(backend.all_tickers()).results
+    prices = frames['AAPL']['Close'].to_numpy()
+    results['calculate_rsi'] = measure(lambda: backend.calculate_rsi(prices), args.repeat)
+    close = close_matrix(frames)
+    results['compute_metrics_matrix'] = measure(lambda: compute_metrics_matrix(close), args.repeat)
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'failure_rate': args.failure_rate,
+            'tickers': len(backend.all_tickers()),
+        },
+        'results': results,
+    }
+
+
+# 比較時使用的主要數值與方向（越大越好或越小越好）
+def key_metric(name):
+    return ('rps', True) if name.startswith('throughput') else ('p50_ms', False)
+
+
+def compare(current, baseline, threshold):
+    """列出與基準相比的變化，回傳退步超過 threshold 的項目"""
+    regressions = []
+    print(f"\n{'項目':<28} {'基準':>12} {'目前':>12} {'變化':>9}")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        metric, higher_is_better = key_metric(name)
+        change = (result[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+        worse = -change if higher_is_better else change
+        flag = '  ← 退步' if worse > threshold else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28} {old[metric]:>12.2f} {result[metric]:>12.2f} {change:>+8.1%} {metric}{flag}")
+    return regressions
+
+
+def print_results(report):
+    for name, result in report['results'].items():
+        metric, _ = key_metric(name)
+        extra = f"  p95={result['p95_ms']:.2f}ms" if 'p95_ms' in result else ''
+        print(f"{name:<28} {metric}={result[metric]:.2f}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='模擬的上游延遲（秒）')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='模擬的上游失敗率')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--cold-repeat', type=int, default=5)
+    parser.add_argument('--import-repeat', type=int, default=5, help='啟動時間量測次數（0 則略過）')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=50, help='每個客戶端的請求數')
+    parser.add_argument('--output', help='結果 JSON 的路徑（預設 bench/results/<時間>.json）')
+    parser.add_argument('--compare', help='與此基準 JSON 比較')
+    parser.add_argument('--threshold', type=float, default=0.10, help='視為退步的變化比例')
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    print_results(report)
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), 'results', datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果已寫入 {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""行情指標快取
+
+TTLCache：以 (ticker, days_back) 為鍵的記憶體快取，具 TTL、LRU 淘汰，
+過期但仍在 stale 期限內的值照常回傳（stale-while-revalidate），由背景重新抓取。
+BackgroundRefresher：定期預熱整個代號清單，並在背景執行單次的重新驗證。
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class TTLCache:
+    """具 TTL、stale 期限與 LRU 淘汰的執行緒安全快取"""
+
+    def __init__(self, ttl=60.0, stale_ttl=900.0, max_entries=1024):
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """回傳 (value, state)；state 為 FRESH、STALE，查無或已失效時為 (None, None)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+
+            value, stored_at, ttl = entry
+            age = now - stored_at
+            if age >= ttl + self.stale_ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None, None
+
+            self._entries.move_to_end(key)
+            if age < ttl:
+                self.hits += 1
+                return value, FRESH
+            self.stale_hits += 1
+            return value, STALE
+
+    def set(self, key, value, ttl=None):
+        """寫入快取；ttl 未指定時使用預設 TTL"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), self.ttl if ttl is None else float(ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+        }
+
+
+class BackgroundRefresher:
+    """背景預熱與重新驗證
+
+    warm 會每 interval 秒被呼叫一次（interval <= 0 則不啟動定期預熱）；
+    revalidate 把重新抓取丟到背景執行，同一個鍵在進行中時不會重複提交。
+    """
+
+    def __init__(self, warm, interval=50.0):
+        self.warm = warm
+        self.interval = float(interval)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='revalidate')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._loop, name='cache-warmer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.warm()
+            except Exception as e:
+                print(f"背景更新錯誤: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def revalidate(self, keys, fn):
+        """在背景以 fn(新提交的鍵) 重新抓取，已在進行中的鍵會略過"""
+        with self._lock:
+            keys = [k for k in keys if k not in self._in_flight]
+            if not keys:
+                return
+            self._in_flight.update(keys)
+
+        def run():
+            try:
+                fn(keys)
+            except Exception as e:
+                print(f"背景更新錯誤: {str(e)}")
+            finally:
+                with self._lock:
+                    self._in_flight.difference_update(keys)
+
+        self._executor.submit(run)
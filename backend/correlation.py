@@ -0,0 +1,71 @@
+"""跨代號相關係數
+
+輸入為對齊後的收盤價矩陣（列為日期、欄為代號，缺值為 NaN）。
+各代號的交易日不同（加密貨幣週末也有報價），因此報酬率以各自前一筆有效收盤價計算，
+相關係數只用兩檔代號都有報酬率的日期（pairwise complete），
+全部以矩陣乘法一次算出，不逐對迴圈。
+"""
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+
+
+def returns_matrix(close):
+    """簡單報酬率矩陣；當天沒有收盤價或之前沒有有效價格時為 NaN"""
+    values = close.to_numpy(dtype=float)
+    previous = close.ffill().shift(1).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values / previous - 1
+
+
+def last_valid(returns, window):
+    """每欄只保留最近 window 筆有效報酬率，其餘設為 NaN（日期位置不變）
+
+    以合併後的日期列取最後 window 列時，加密貨幣的週末會讓股票只剩約 5/7 的資料；
+    改為每欄各取自己的 window 筆。
+    """
+    returns = np.asarray(returns, dtype=float)
+    valid = ~np.isnan(returns)
+    newer = np.cumsum(valid[::-1], axis=0)[::-1]  # 該列（含）之後的有效筆數
+    return np.where(newer <= window, returns, np.nan)
+
+
+def correlation_matrix(returns, min_periods=2):
+    """成對的皮爾森相關係數；共同資料少於 min_periods 筆或變異為 0 時為 NaN
+
+    以遮罩 m 與補 0 後的 x 計算：n = mᵀm 為共同筆數，sx = xᵀm 為 i 在與 j
+    共同日期上的總和，sxx、sxy 同理，再由這些和求出共變異與變異。
+    """
+    returns = np.asarray(returns, dtype=float)
+    mask = ~np.isnan(returns)
+    m = mask.astype(float)
+    x = np.where(mask, returns, 0.0)
+
+    n = m.T @ m
+    sx = x.T @ m
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sx.T / n
+        var = sxx - sx * sx / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[(n < min_periods) | ~(var > 0) | ~(var.T > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def group_average(corr, groups):
+    """分類間的平均相關係數（熱圖）；groups 為 [[欄位索引, ...], ...]
+
+    同分類內不計自己與自己；沒有任何有效配對時為 NaN。
+    """
+    membership = np.zeros((corr.shape[0], len(groups)))
+    for k, columns in enumerate(groups):
+        membership[columns, k] = 1.0
+    valid = ~np.isnan(corr)
+    np.fill_diagonal(valid, False)
+    values = np.where(valid, corr, 0.0)
+
+    totals = membership.T @ values @ membership
+    counts = membership.T @ valid.astype(float) @ membership
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, totals / counts, np.nan)
@@ -0,0 +1,70 @@
+"""圖表用的日線降採樣
+
+lttb：Largest-Triangle-Three-Buckets，依收盤價挑出最能保留走勢形狀的 K 棒。
+minmax：把相鄰的 K 棒分桶合併（開=首、高=最大、低=最小、收=末、量=加總），
+保證每個區間的最高與最低價都會出現在結果中。
+"""
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+METHODS = ('lttb', 'minmax')
+
+
+def bucket_starts(size, buckets):
+    """把 [0, size) 平均切成 buckets 段，回傳各段的起始索引"""
+    return np.unique(np.linspace(0, size, buckets + 1).astype(np.int64)[:-1])
+
+
+def lttb_indices(x, y, points):
+    """LTTB 挑選的索引（含頭尾）；points 不小於資料長度時回傳全部"""
+    size = len(y)
+    if points >= size:
+        return np.arange(size)
+    if points < 3:
+        return np.array([0, size - 1][:max(points, 1)])
+
+    # 頭尾以外的點分成 points - 2 桶，每桶挑一點
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x = x[hi:edges[i + 2]].mean()
+            avg_y = y[hi:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        # 以上一個選中點、本桶候選點、下一桶平均點構成的三角形面積最大者
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_ohlc(df, points):
+    """把日線合併成最多 points 根 K 棒"""
+    if points >= len(df):
+        return df
+    starts = bucket_starts(len(df), points)
+    ends = np.append(starts[1:], len(df)) - 1
+    return pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts),
+    }, index=df.index[starts])
+
+
+def downsample(df, points, method='lttb'):
+    """把日線降到最多 points 筆；method 為 lttb 或 minmax，未知時拋出 ValueError"""
+    if method not in METHODS:
+        raise ValueError(f"未知的降採樣方法: {method}")
+    df = df[df['Close'].notna()]
+    if method == 'minmax':
+        return minmax_ohlc(df, points)
+    x = df.index.asi8 / 86_400e9  # 以天為單位，避免奈秒數值過大
+    return df.iloc[lttb_indices(x, df['Close'].to_numpy(dtype=float), points)]
@@ -0,0 +1,100 @@
+"""本機日線歷史資料庫
+
+以 SQLite 保存每檔代號完整的日線 OHLC，並記錄已涵蓋的起始日期，
+之後只需向資料來源抓取最後一筆之後的尾端資料（最後一天會重抓，
+因為盤中存下的可能是未收盤的價格）。
+"""
+import os
+import sqlite3
+import threading
+
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL
+);
+"""
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+class HistoryStore:
+    """SQLite 日線資料庫（執行緒安全）"""
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+
+    def fetch_start(self, ticker, start):
+        """要補齊 [start, 今天] 時應從哪一天開始抓取"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT c.covered_from, MAX(b.date) FROM coverage c '
+                'LEFT JOIN bars b ON b.ticker = c.ticker WHERE c.ticker = ?',
+                (ticker,),
+            ).fetchone()
+        if row is None or row[0] is None or row[1] is None or row[0] > _day(start):
+            return pd.Timestamp(start)
+        return pd.Timestamp(row[1])
+
+    def append(self, ticker, df, fetched_from):
+        """寫入（覆蓋同日期的）日線，並更新涵蓋範圍"""
+        if df is None or df.empty:
+            return
+        adj = df['Adj Close'] if 'Adj Close' in df else df['Close']
+        rows = zip(
+            [ticker] * len(df),
+            df.index.strftime('%Y-%m-%d'),
+            *(np.asarray(col, dtype=float).tolist()
+              for col in (df['Open'], df['High'], df['Low'], df['Close'], adj, df['Volume'])),
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.execute(
+                'INSERT INTO coverage VALUES (?, ?) ON CONFLICT(ticker) '
+                'DO UPDATE SET covered_from = MIN(covered_from, excluded.covered_from)',
+                (ticker, _day(fetched_from)),
+            )
+
+    def load(self, ticker, start=None, end=None):
+        """讀出 [start, end) 的日線；查無資料時回傳空的 DataFrame"""
+        query = ('SELECT date, open, high, low, close, adj_close, volume '
+                 'FROM bars WHERE ticker = ?')
+        params = [ticker]
+        if start is not None:
+            query += ' AND date >= ?'
+            params.append(_day(start))
+        if end is not None:
+            query += ' AND date < ?'
+            params.append(_day(end))
+        query += ' ORDER BY date'
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([]))
+        dates, *values = zip(*rows)
+        return pd.DataFrame(dict(zip(COLUMNS, values)), index=pd.DatetimeIndex(dates))
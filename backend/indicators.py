@@ -0,0 +1,277 @@
+"""增量技術指標
+
+每個指標保存自己的執行狀態，新增一根 K 棒只需 O(1) 更新：
+Wilder RSI、SMA、EMA、MACD、布林通道與 ATR。
+IndicatorEngine 依 (ticker, 指標組合) 保存狀態，只把上次之後的新 K 棒餵進去。
+"""
+import copy
+import math
+import threading
+from collections import deque
+
+
+class WilderRSI:
+    """Wilder 平滑的 RSI：前 period 個漲跌取平均作為種子，之後以 1/period 平滑"""
+
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.prev_close = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        self.count += 1
+        if self.count <= self.period:
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.period:
+            return None
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else 50.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+class SMA:
+    """簡單移動平均（保存視窗內的值與總和）"""
+
+    def __init__(self, period=20):
+        self.period = int(period)
+        self.window = deque()
+        self.total = 0.0
+
+    def push(self, x):
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        return self.value
+
+    def update(self, high, low, close):
+        return self.push(close)
+
+    @property
+    def value(self):
+        return self.total / self.period if len(self.window) == self.period else None
+
+
+class EMA:
+    """指數移動平均，以前 period 筆的 SMA 作為起始值"""
+
+    def __init__(self, period=20):
+        self.period = int(period)
+        self.alpha = 2 / (self.period + 1)
+        self.count = 0
+        self.current = 0.0
+
+    def push(self, x):
+        self.count += 1
+        if self.count <= self.period:
+            self.current += x / self.period
+        else:
+            self.current += self.alpha * (x - self.current)
+        return self.value
+
+    def update(self, high, low, close):
+        return self.push(close)
+
+    @property
+    def value(self):
+        return self.current if self.count >= self.period else None
+
+
+class MACD:
+    """MACD 線、訊號線與柱狀值"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.macd = None
+
+    def update(self, high, low, close):
+        fast, slow = self.fast.push(close), self.slow.push(close)
+        if fast is None or slow is None:
+            return None
+        self.macd = fast - slow
+        self.signal.push(self.macd)
+        return self.value
+
+    @property
+    def value(self):
+        if self.macd is None:
+            return None
+        signal = self.signal.value
+        return {
+            'macd': self.macd,
+            'signal': signal,
+            'hist': self.macd - signal if signal is not None else None,
+        }
+
+
+class Bollinger:
+    """布林通道（母體標準差），保存視窗內的和與平方和"""
+
+    def __init__(self, period=20, k=2.0):
+        self.period = int(period)
+        self.k = float(k)
+        self.window = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, high, low, close):
+        self.window.append(close)
+        self.total += close
+        self.total_sq += close * close
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.window) < self.period:
+            return None
+        mean = self.total / self.period
+        std = max(self.total_sq / self.period - mean * mean, 0.0) ** 0.5
+        return {'middle': mean, 'upper': mean + self.k * std, 'lower': mean - self.k * std}
+
+
+class ATR:
+    """Wilder 平滑的平均真實區間"""
+
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.prev_close = None
+        self.count = 0
+        self.current = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+
+        self.count += 1
+        if self.count <= self.period:
+            self.current += true_range / self.period
+        else:
+            self.current = (self.current * (self.period - 1) + true_range) / self.period
+        return self.value
+
+    @property
+    def value(self):
+        return self.current if self.count >= self.period else None
+
+
+# 名稱: (類別, 預設參數)；預設值為 int 的參數只接受正整數（週期），float 的可為小數
+INDICATORS = {
+    'rsi': (WilderRSI, (14,)),
+    'sma': (SMA, (20,)),
+    'ema': (EMA, (20,)),
+    'macd': (MACD, (12, 26, 9)),
+    'bb': (Bollinger, (20, 2.0)),
+    'atr': (ATR, (14,)),
+}
+
+
+def parse_spec(spec):
+    """解析 'rsi,sma:50,bb:20:2' 形式的指標組合，回傳 [(標籤, 名稱, 參數)]
+
+    格式錯誤時拋出 ValueError。
+    """
+    parsed = []
+    for token in (t.strip().lower() for t in spec.split(',')):
+        if not token:
+            continue
+        name, *params = token.split(':')
+        if name not in INDICATORS:
+            raise ValueError(f"未知的指標: {name}")
+        defaults = INDICATORS[name][1]
+        if len(params) > len(defaults):
+            raise ValueError(f"參數過多: {token}")
+        try:
+            values = tuple(type(default)(p) for p, default in zip(params, defaults))
+        except ValueError:
+            raise ValueError(f"參數格式錯誤: {token}") from None
+        if any(not math.isfinite(v) or v <= 0 for v in values):
+            raise ValueError(f"參數必須為正數: {token}")
+        parsed.append((token, name, values + defaults[len(values):]))
+    if not parsed:
+        raise ValueError("未指定指標")
+    return parsed
+
+
+class IndicatorSet:
+    """一組指標的執行狀態"""
+
+    def __init__(self, parsed):
+        self.indicators = {label: INDICATORS[name][0](*params) for label, name, params in parsed}
+        self.last_date = None
+
+    def update(self, date, high, low, close):
+        for indicator in self.indicators.values():
+            indicator.update(high, low, close)
+        self.last_date = date
+
+    def values(self):
+        return {label: indicator.value for label, indicator in self.indicators.items()}
+
+
+class IndicatorEngine:
+    """依 (ticker, 指標組合) 保存狀態的增量指標引擎
+
+    已收盤的 K 棒會寫入狀態；最後一根（可能是盤中未定的價格）只在
+    狀態的複本上計算，下次更新時再以定案的值正式寫入。
+    """
+
+    def __init__(self, max_states=2048):
+        self.max_states = max_states
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def last_date(self, ticker, spec):
+        state = self._states.get((ticker, spec))
+        return state.last_date if state is not None else None
+
+    def evaluate(self, ticker, spec, bars):
+        """以 bars（上次 last_date 之後的 K 棒，DataFrame）更新並回傳最新指標值"""
+        key = (ticker, spec)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if len(self._states) >= self.max_states:
+                    self._states.pop(next(iter(self._states)))
+                state = self._states[key] = IndicatorSet(parse_spec(spec))
+
+            if state.last_date is not None:
+                bars = bars[bars.index > state.last_date]
+            if bars.empty:
+                return state.values()
+
+            rows = list(zip(bars.index, bars['High'], bars['Low'], bars['Close']))
+            for date, high, low, close in rows[:-1]:
+                state.update(date, float(high), float(low), float(close))
+
+            preview = copy.deepcopy(state)
+            date, high, low, close = rows[-1]
+            preview.update(date, float(high), float(low), float(close))
+            return preview.values()
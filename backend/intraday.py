@@ -0,0 +1,171 @@
+"""盤中分鐘線
+
+MinuteRing：每檔代號一個固定容量的環狀緩衝區（NumPy 陣列），只保留最近 capacity 根
+一分鐘 K 棒，每檔占用的記憶體固定。新 K 棒到達時只更新當日的成交量加權累計值，
+日漲跌、往前 k 根的動能與 VWAP 都以 O(1) 從緩衝區與累計值取得，不重新掃描整段資料。
+IntradayBook：所有代號的 MinuteRing。
+
+時間以交易所當地時間（美東）自 1970 起的分鐘數保存，交易日為其整除 1440 的天數。
+"""
+import threading
+
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CLOSE = FIELDS.index('Close')
+MOMENTUM_WINDOWS = (5, 15, 30)
+INTRADAY_FIELDS = ['price', 'day', *(f'momentum_{k}m' for k in MOMENTUM_WINDOWS), 'vwap', 'volume', 'time']
+
+
+def _pct(last, base):
+    if base is None or not base or base != base:
+        return None
+    return float((last - base) / base * 100)
+
+
+class MinuteRing:
+    """單一代號的分鐘線環狀緩衝區與當日累計值"""
+
+    __slots__ = ('capacity', 'times', 'bars', 'head', 'size',
+                 'session', 'session_open', 'session_pv', 'session_volume', 'prev_close')
+
+    def __init__(self, capacity=390):
+        self.capacity = int(capacity)
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        self.bars = np.full((self.capacity, len(FIELDS)), np.nan)
+        self.head = 0  # 下一個寫入的位置
+        self.size = 0
+        self.session = None  # 最新 K 棒所屬的交易日
+        self.session_open = None
+        self.session_pv = 0.0  # 當日 Σ 典型價 × 量
+        self.session_volume = 0.0
+        self.prev_close = None  # 前一交易日最後一根的收盤價
+
+    def _slot(self, back):
+        return (self.head - 1 - back) % self.capacity
+
+    @property
+    def last_time(self):
+        return int(self.times[self._slot(0)]) if self.size else None
+
+    def close(self, back=0):
+        """往前第 back 根的收盤價"""
+        return self.bars[self._slot(back), CLOSE]
+
+    def _pop(self):
+        """移除最後一根（仍在形成中的 K 棒即將被覆蓋），並扣除它的當日累計"""
+        slot = self._slot(0)
+        if self.times[slot] // 1440 == self.session:
+            _, high, low, close, volume = self.bars[slot]
+            volume = 0.0 if volume != volume else volume
+            self.session_pv -= (high + low + close) / 3 * volume
+            self.session_volume -= volume
+        self.head = slot
+        self.size -= 1
+
+    def append(self, minutes, values):
+        """加入依時間排序的 K 棒；minutes 為 int64 分鐘，values 為 (n, 5) 的 OHLCV
+
+        早於最後一根的忽略，與最後一根同一分鐘的覆蓋之；回傳新增或覆蓋的筆數。
+        """
+        last = self.last_time
+        if last is not None:
+            keep = minutes >= last
+            minutes, values = minutes[keep], values[keep]
+            if len(minutes) and minutes[0] == last:
+                self._pop()
+        n = len(minutes)
+        if not n:
+            return 0
+
+        sessions = minutes // 1440
+        final = sessions[-1]
+        current = sessions == final
+        if final != self.session:
+            # 換日：前一交易日最後一根的收盤價作為昨收，當日累計值重設
+            earlier = np.flatnonzero(~current)
+            if len(earlier):
+                self.prev_close = float(values[earlier[-1], CLOSE])
+            elif self.size:
+                self.prev_close = float(self.close())
+            self.session = int(final)
+            self.session_open = float(values[current][0, 0])
+            self.session_pv = self.session_volume = 0.0
+        volume = np.nan_to_num(values[current, 4])
+        typical = values[current, 1:4].mean(axis=1)
+        self.session_pv += float(typical @ volume)
+        self.session_volume += float(volume.sum())
+
+        if n > self.capacity:
+            minutes, values = minutes[-self.capacity:], values[-self.capacity:]
+        slots = (self.head + np.arange(len(minutes))) % self.capacity
+        self.times[slots] = minutes
+        self.bars[slots] = values
+        self.head = (self.head + len(minutes)) % self.capacity
+        self.size = min(self.capacity, self.size + len(minutes))
+        return n
+
+    def metrics(self):
+        """最新價、日漲跌（%）、往前 k 根的動能（%）、當日 VWAP 與成交量"""
+        if not self.size:
+            return None
+        price = self.close()
+        data = {
+            'price': float(price),
+            'day': _pct(price, self.prev_close if self.prev_close is not None else self.session_open),
+        }
+        for k in MOMENTUM_WINDOWS:
+            data[f'momentum_{k}m'] = _pct(price, self.close(k)) if self.size > k else None
+        data['vwap'] = self.session_pv / self.session_volume if self.session_volume > 0 else None
+        data['volume'] = self.session_volume
+        data['time'] = pd.Timestamp(self.last_time * 60, unit='s').isoformat()
+        return data
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.bars.nbytes
+
+
+def frame_minutes(df):
+    """把分鐘線 DataFrame（美東時間、無時區，見 providers.strip_tz）轉成 (分鐘, OHLCV)"""
+    df = df[df['Close'].notna()].sort_index()
+    return df.index.asi8 // 60_000_000_000, df[FIELDS].to_numpy(dtype=float)
+
+
+class IntradayBook:
+    """所有代號的分鐘線緩衝區（執行緒安全）"""
+
+    def __init__(self, capacity=390):
+        self.capacity = int(capacity)
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def last_time(self, ticker):
+        """最後一根 K 棒的時間（美東時間，無時區）；沒有資料時為 None"""
+        ring = self._rings.get(ticker)
+        if ring is None or not ring.size:
+            return None
+        return pd.Timestamp(ring.last_time * 60, unit='s')
+
+    def update(self, ticker, df):
+        """併入新抓到的分鐘線，回傳更新後的指標"""
+        minutes, values = frame_minutes(df)
+        with self._lock:
+            ring = self._rings.get(ticker)
+            if ring is None:
+                ring = self._rings[ticker] = MinuteRing(self.capacity)
+            ring.append(minutes, values)
+            return ring.metrics()
+
+    def metrics(self, ticker):
+        with self._lock:
+            ring = self._rings.get(ticker)
+            return ring.metrics() if ring is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {'tickers': len(self._rings),
+                    'bytes': sum(ring.nbytes for ring in self._rings.values())}
@@ -0,0 +1,28 @@
+"""延遲匯入
+
+pandas、numpy 與 yfinance 合計要數百毫秒才能載入完成。各資料模組以 LazyModule
+代替直接 import，載入 app 時只建立代理物件，第一次真正用到時才匯入；
+/api/health 與從快取提供的快照因此不必等資料層載入完成。
+"""
+import importlib
+
+
+class LazyModule:
+    """第一次存取屬性時才匯入的模組代理
+
+    importlib.import_module 本身有模組鎖，多個執行緒同時觸發也只會匯入一次。
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+        self._lazy_module = None
+
+    def __getattr__(self, attr):
+        module = self._lazy_module
+        if module is None:
+            module = self._lazy_module = importlib.import_module(self._lazy_name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'not loaded' if self._lazy_module is None else 'loaded'
+        return f'<LazyModule {self._lazy_name!r} ({state})>'
@@ -0,0 +1,107 @@
+"""各資產類別的交易時段
+
+時段以美東時間（America/New_York，含夏令時間）的每週區間表示，
+區間為自週一 00:00 起的分鐘數 [開始, 結束)：
+
+- crypto：全天候
+- fx：週日 17:00 至週五 17:00
+- equity（股票、ETF、指數）：週一至週五 9:30–16:00
+- futures：週日 18:00 至週五 17:00，每日 17:00–18:00 休息
+
+未列入交易所假日；假日當天照常視為開盤，只是多抓幾次不會變動的資料。
+代號依後綴分類（-USD 加密貨幣、=X 外匯、=F 期貨，其餘為交易所掛牌），
+特例在 universe.json 的 asset_classes 中覆寫。
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo('America/New_York')
+
+_DAY = 1440
+_WEEK = 7 * _DAY
+SUN, MON, FRI = 6, 0, 4
+
+
+def _at(day, hour, minute=0):
+    return day * _DAY + hour * 60 + minute
+
+
+SESSIONS = {
+    'crypto': None,
+    'fx': [(_at(MON, 0), _at(FRI, 17)), (_at(SUN, 17), _WEEK)],
+    'equity': [(_at(day, 9, 30), _at(day, 16)) for day in range(MON, FRI + 1)],
+    'futures': [(_at(MON, 0), _at(MON, 17))]
+               + [(_at(day, 18), _at(day + 1, 17)) for day in range(MON, FRI)]
+               + [(_at(SUN, 18), _WEEK)],
+}
+ASSET_CLASSES = tuple(SESSIONS)
+
+
+def classify(ticker):
+    """依代號後綴推測資產類別"""
+    if ticker.endswith('-USD'):
+        return 'crypto'
+    if ticker.endswith('=X'):
+        return 'fx'
+    if ticker.endswith('=F'):
+        return 'futures'
+    return 'equity'
+
+
+def _local(now):
+    return (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+
+
+def _boundaries(asset_class, local):
+    """上週到下週每個區間的 (開盤, 收盤) 時間，依時間排序"""
+    monday = datetime.combine(local.date() - timedelta(days=local.weekday()), time(0), tzinfo=MARKET_TZ)
+    spans = []
+    for week in (-1, 0, 1):
+        base = monday + timedelta(weeks=week)
+        spans.extend((base + timedelta(minutes=s), base + timedelta(minutes=e))
+                     for s, e in SESSIONS[asset_class])
+    return spans
+
+
+def is_open(asset_class, now=None):
+    if SESSIONS[asset_class] is None:
+        return True
+    local = _local(now)
+    return any(start <= local < end for start, end in _boundaries(asset_class, local))
+
+
+def last_close(asset_class, now=None):
+    """最近一次收盤時間（市場開盤中則為本時段之前的收盤）；全天候市場為 None"""
+    if SESSIONS[asset_class] is None:
+        return None
+    local = _local(now)
+    # 相鄰區間首尾相接（例如 fx 的週日 24:00 與週一 00:00）不算收盤
+    spans = _boundaries(asset_class, local)
+    closes = [end for (_, end), (start, _) in zip(spans, spans[1:] + [(None, None)]) if end != start]
+    return max(end for end in closes if end <= local)
+
+
+def next_open(asset_class, now=None):
+    """下一次開盤時間；開盤中或全天候市場回傳 now"""
+    local = _local(now)
+    if is_open(asset_class, local):
+        return local
+    return min(start for start, _ in _boundaries(asset_class, local) if start > local)
+
+
+def closed_for(asset_class, now=None, grace=0.0):
+    """收盤超過 grace 秒、休市中時距下次開盤的秒數；開盤中或仍在收盤緩衝期內時為 0"""
+    local = _local(now)
+    if is_open(asset_class, local):
+        return 0.0
+    if local.timestamp() - last_close(asset_class, local).timestamp() < grace:
+        return 0.0
+    return next_open(asset_class, local).timestamp() - local.timestamp()
+
+
+def needs_refresh(asset_class, last_fetched, now=None, grace=0.0):
+    """開盤中，或休市中但上次抓取早於「收盤 + grace 秒」（收盤價可能尚未定案）時需要更新"""
+    local = _local(now)
+    if last_fetched is None or is_open(asset_class, local):
+        return True
+    return last_fetched.timestamp() < last_close(asset_class, local).timestamp() + grace
@@ -0,0 +1,156 @@
+"""向量化指標計算
+
+輸入為對齊後的收盤價矩陣（列為日期、欄為代號，缺值為 NaN），
+一次計算所有代號的價格、各時間段漲跌幅與 RSI，不再逐檔以 iloc 取值。
+每檔代號的「往前 N 筆」以該代號自己的有效資料計算，與逐檔計算的結果一致。
+"""
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# 名稱: (往前幾筆, 至少需要幾筆資料，不足時為 0)
+RETURN_WINDOWS = {
+    'day': (1, 2),
+    'week': (4, 6),
+    'month': (20, 22),
+}
+
+METRIC_FIELDS = ['price', 'day', 'week', 'month', 'ytd', 'rsi']
+
+
+def close_matrix(frames, column='Close'):
+    """把 {ticker: DataFrame} 對齊成收盤價矩陣"""
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat({ticker: df[column] for ticker, df in frames.items()}, axis=1).sort_index()
+
+
+def pack_columns(values):
+    """把每欄的有效值往下對齊（NaN 移到上方），回傳 (packed, 每欄有效筆數)"""
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    order = np.argsort(valid, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), valid.sum(axis=0)
+
+
+def _pct_change(last, base):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (last - base) / base * 100
+
+
+def _wilder_averages(packed, counts, period, history=False):
+    """Wilder 平滑的平均漲跌 (avg_gain, avg_loss)
+
+    history=False 時只回傳最後一列（每欄一個值）；history=True 時回傳與 packed 同形狀的矩陣，
+    各欄種子之前的位置沒有意義（由呼叫端以筆數遮掉）。
+    漲跌與各欄的種子（前 period 個漲跌的平均）都對整個矩陣一次算出。
+    """
+    rows, cols = packed.shape
+    if rows < 2:
+        empty = np.zeros(packed.shape if history else cols)
+        return empty, empty.copy()
+
+    seed_at = rows - counts + period - 1  # 各欄第 period 個漲跌在 delta 中的索引
+    delta = np.diff(packed, axis=0)
+    # 開始之前的漲跌為 NaN，補 0 後累加到種子位置即為前 period 個漲跌的總和
+    gains = np.nan_to_num(np.maximum(delta, 0))
+    losses = np.nan_to_num(np.maximum(-delta, 0))
+    at = np.minimum(seed_at, rows - 2)
+    columns = np.arange(cols)
+    seed_gain = np.cumsum(gains, axis=0)[at, columns] / period
+    seed_loss = np.cumsum(losses, axis=0)[at, columns] / period
+
+    if not history:
+        # 遞推 a ← (a·(p-1) + x) / p 展開後，最後一列為 α^(n) · 種子 + Σ α^(last-d) · x_d / p
+        # （α = (p-1)/p，d 為種子之後的每個漲跌），一次加權加總，不需逐列迴圈
+        alpha = (period - 1) / period
+        last = rows - 2
+        steps = np.arange(rows - 1)
+        weights = (alpha ** (last - steps))[:, None] / period
+        after = steps[:, None] > seed_at[None, :]
+        decay = alpha ** np.maximum(last - seed_at, 0)
+        return (decay * seed_gain + (np.where(after, gains, 0) * weights).sum(axis=0),
+                decay * seed_loss + (np.where(after, losses, 0) * weights).sum(axis=0))
+
+    # 每一列都要時逐列遞推：從最早的種子開始，欄位依種子位置排序，
+    # 每一步只以原地運算更新已有種子的前綴欄位
+    order = np.argsort(seed_at, kind='stable')
+    seed_at = seed_at[order]
+    gains, losses = gains[:, order], losses[:, order]
+    avg_gain, avg_loss = seed_gain[order], seed_loss[order]
+    gain_rows = np.zeros(packed.shape)
+    loss_rows = np.zeros(packed.shape)
+    seeded = np.searchsorted(seed_at, np.arange(rows - 1), 'left')  # 第 d 步時種子在 d 之前的欄數
+    for d in range(int(seed_at[0]) if cols else rows - 1, rows - 1):
+        k = seeded[d]
+        if k:
+            g, l = avg_gain[:k], avg_loss[:k]
+            g *= period - 1
+            g += gains[d, :k]
+            g /= period
+            l *= period - 1
+            l += losses[d, :k]
+            l /= period
+        gain_rows[d + 1] = avg_gain
+        loss_rows[d + 1] = avg_loss
+
+    inverse = np.empty_like(order)
+    inverse[order] = columns
+    return gain_rows[:, inverse], loss_rows[:, inverse]
+
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+
+
+def rsi_matrix(packed, counts, period=14):
+    """Wilder 平滑的 RSI（取每欄最新一筆；資料不足時為 NaN）"""
+    avg_gain, avg_loss = _wilder_averages(packed, counts, period)
+    return np.where(counts >= period + 1, _rsi(avg_gain, avg_loss), np.nan)
+
+
+def rsi_history(packed, counts, period=14):
+    """每一列的 Wilder RSI，形狀與 packed 相同；該欄累積不足 period + 1 筆的位置為 NaN"""
+    rows = packed.shape[0]
+    gains, losses = _wilder_averages(packed, counts, period, history=True)
+    have = np.arange(rows)[:, None] - (rows - counts)[None, :] + 1  # 到這一列為止的筆數
+    return np.where(have >= period + 1, _rsi(gains, losses), np.nan)
+
+
+def compute_metrics_matrix(close, rsi_period=14):
+    """計算所有代號的指標，回傳以代號為索引、METRIC_FIELDS 為欄位的 DataFrame
+
+    完全沒有資料的代號不會出現在結果中。
+    """
+    if close.empty:
+        return pd.DataFrame(columns=METRIC_FIELDS)
+
+    packed, counts = pack_columns(close.to_numpy())
+    rows = packed.shape[0]
+    last = packed[-1]
+
+    out = {'price': last}
+    for name, (lookback, min_len) in RETURN_WINDOWS.items():
+        base = packed[max(0, rows - 1 - lookback)]
+        out[name] = np.where(counts >= min_len, _pct_change(last, base), 0.0)
+
+    first = packed[np.clip(rows - counts, 0, rows - 1), np.arange(packed.shape[1])]
+    out['ytd'] = _pct_change(last, first)
+    out['rsi'] = rsi_matrix(packed, counts, rsi_period)
+
+    result = pd.DataFrame(out, index=close.columns)
+    return result[counts > 0]
+
+
+def metrics_records(table):
+    """把指標表轉成 {ticker: dict}；RSI 資料不足時為 None"""
+    records = {}
+    for ticker, row in zip(table.index, table.to_numpy()):
+        data = dict(zip(METRIC_FIELDS, (float(v) for v in row)))
+        if np.isnan(data['rsi']):
+            data['rsi'] = None
+        records[ticker] = data
+    return records
@@ -0,0 +1,232 @@
+"""行情資料來源
+
+`get_stock_data` 與批次抓取都透過這裡的 provider 取得日線 OHLC，
+預設為 Yahoo Finance；設定環境變數 DATA_PROVIDER=fake 可改用本機合成資料，
+方便在不連網的情況下測試與壓測。
+"""
+import os
+import random
+import threading
+import time
+import zlib
+
+from lazy import LazyModule
+from resilience import UpstreamThrottled
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+yf = LazyModule('yfinance')
+
+OHLC_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 分鐘線的時間一律以美東時間表示
+INTRADAY_TZ = 'America/New_York'
+
+# yfinance 錯誤訊息中代表被限流的字樣
+THROTTLE_MARKERS = ('too many requests', '429', 'rate limit')
+
+
+def chunked(items, size):
+    """把清單切成固定大小的區塊"""
+    items = list(items)
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def split_frame(df, tickers):
+    """把多代號下載的寬表拆成 {ticker: DataFrame}
+
+    group_by='ticker' 時欄位為 (ticker, 欄位) 的 MultiIndex；
+    只有一個代號時 yfinance 會回傳一般欄位。
+    """
+    frames = {}
+    if df is None or df.empty:
+        return frames
+
+    wanted = {t.upper(): t for t in tickers}
+    if isinstance(df.columns, pd.MultiIndex):
+        for key in df.columns.get_level_values(0).unique():
+            ticker = wanted.get(str(key).upper())
+            if ticker is None:
+                continue
+            sub = df[key].dropna(how='all')
+            if not sub.empty:
+                frames[ticker] = sub
+    elif len(tickers) == 1:
+        sub = df.dropna(how='all')
+        if not sub.empty:
+            frames[tickers[0]] = sub
+    return frames
+
+
+def strip_tz(df, intraday=False):
+    """日線去掉時區保留當地日期；分鐘線統一換成美東時間後去掉時區"""
+    if df.index.tz is None:
+        return df
+    df = df.copy()
+    index = df.index.tz_convert(INTRADAY_TZ) if intraday else df.index
+    df.index = index.tz_localize(None)
+    return df
+
+
+class YahooProvider:
+    """Yahoo Finance：一次 yf.download 抓取整批代號
+
+    yf.download 使用模組層級的共用狀態，不能在多個執行緒同時呼叫，
+    因此整批下載以鎖保護（其內部本身已平行抓取）；單一代號改走
+    yf.Ticker().history，可與其他工作併發執行。
+    """
+
+    name = 'yahoo'
+    host = 'query2.finance.yahoo.com'
+    _download_lock = threading.Lock()
+
+    def download(self, tickers, start, end, interval='1d'):
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        if len(tickers) == 1:
+            df = yf.Ticker(tickers[0]).history(start=start, end=end, interval=interval, auto_adjust=False)
+            frames = split_frame(df, tickers)
+            errors = {tickers[0]: yf.shared._ERRORS.get(tickers[0].upper(), '')} if not frames else {}
+        else:
+            with self._download_lock:
+                df = yf.download(tickers, start=start, end=end, interval=interval,
+                                 progress=False, group_by='ticker')
+                errors = {t: yf.shared._ERRORS.get(t.upper(), '') for t in tickers}
+            frames = split_frame(df, tickers)
+        frames = {t: strip_tz(f, intraday=interval != '1d') for t, f in frames.items()}
+
+        # yfinance 把錯誤吞掉只記在 shared._ERRORS，被限流的代號改以例外回報讓上層重試
+        throttled = [t for t, err in errors.items()
+                     if t not in frames and any(m in str(err).lower() for m in THROTTLE_MARKERS)]
+        if throttled:
+            raise UpstreamThrottled(f"Yahoo 限流: {', '.join(throttled)}", frames, throttled)
+        return frames
+
+
+class FakeProvider:
+    """決定性的合成日線資料（以代號為亂數種子的幾何隨機漫步）
+
+    interval='1m' 時產生美東 9:30–16:00 的分鐘線，從前一交易日收盤價開始隨機漫步，
+    不會產生晚於現在（美東時間）的 K 棒。
+    latency 為每次呼叫的模擬延遲秒數，failure_rate 為呼叫失敗（拋出 ConnectionError）
+    的機率；失敗與否由 seed 決定，重跑結果相同。
+    """
+
+    name = 'fake'
+    host = 'localhost'
+    epoch = '2000-01-03'
+
+    def __init__(self, missing=(), latency=0.0, failure_rate=0.0, seed=0):
+        self.missing = {t.upper() for t in missing}
+        self.latency = float(latency)
+        self.failure_rate = float(failure_rate)
+        self.calls = 0
+        self._series = {}
+        self._minutes = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(latency=os.environ.get('FAKE_LATENCY', 0),
+                   failure_rate=os.environ.get('FAKE_FAILURE_RATE', 0))
+
+    def _full_series(self, ticker, end):
+        end = end.normalize() + pd.Timedelta(days=1)
+        cached = self._series.get(ticker)
+        if cached is not None and cached[0] >= end:
+            return cached[1]
+
+        days = np.arange(np.datetime64(self.epoch), end.to_datetime64(), np.timedelta64(1, 'D'),
+                         dtype='datetime64[D]')
+        index = pd.DatetimeIndex(days[np.is_busday(days)])
+        rng = np.random.default_rng(zlib.crc32(ticker.encode('utf-8')))
+        returns = rng.normal(0.0003, 0.015, len(index))
+        close = 100 * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.01, len(index)))
+        df = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.003, len(index))),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, len(index)).astype(float),
+        }, index=index)
+        df['Adj Close'] = df['Close']
+        self._series[ticker] = (end, df)
+        return df
+
+    def _session_minutes(self, ticker, day):
+        """day 當天 390 根分鐘線（day 須為交易日）"""
+        key = (ticker, day)
+        cached = self._minutes.get(key)
+        if cached is not None:
+            return cached
+
+        daily = self._full_series(ticker, day)
+        prev_close = daily['Close'][daily.index < day].iloc[-1]
+        rng = np.random.default_rng([zlib.crc32(ticker.encode('utf-8')), day.toordinal()])
+        close = prev_close * np.exp(np.cumsum(rng.normal(0, 0.0008, 390)))
+        opens = np.concatenate([[prev_close], close[:-1]])
+        spread = np.abs(rng.normal(0, 0.0004, 390))
+        df = pd.DataFrame({
+            'Open': opens,
+            'High': np.maximum(opens, close) * (1 + spread),
+            'Low': np.minimum(opens, close) * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000, 100_000, 390).astype(float),
+        }, index=day + pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(390), unit='min'))
+        df['Adj Close'] = df['Close']
+        self._minutes[key] = df
+        return df
+
+    def _minute_bars(self, ticker, start, end):
+        end = min(pd.Timestamp(end), pd.Timestamp.now(tz=INTRADAY_TZ).tz_localize(None))
+        days = np.arange(np.datetime64(start.date()), np.datetime64(end.date()) + 1, dtype='datetime64[D]')
+        sessions = [self._session_minutes(ticker, day) for day in pd.DatetimeIndex(days[np.is_busday(days)])]
+        if not sessions:
+            return pd.DataFrame()
+        df = pd.concat(sessions)
+        return df[(df.index >= start) & (df.index < end)]
+
+    def download(self, tickers, start, end, interval='1d'):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("模擬的上游錯誤")
+
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        first_day = start.normalize()
+        frames = {}
+        for ticker in tickers:
+            if ticker.upper() in self.missing:
+                continue
+            if interval == '1m':
+                df = self._minute_bars(ticker, start, end)
+                if not df.empty:
+                    frames[ticker] = df
+                continue
+            df = self._full_series(ticker, end)
+            sub = df[(df.index >= first_day) & (df.index < end)]
+            if not sub.empty:
+                frames[ticker] = sub
+        return frames
+
+
+PROVIDERS = {
+    'yahoo': YahooProvider,
+    'fake': FakeProvider,
+}
+
+
+def create_provider(name=None):
+    """依名稱（或環境變數 DATA_PROVIDER）建立資料來源"""
+    name = (name or os.environ.get('DATA_PROVIDER', 'yahoo')).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"未知的資料來源: {name}")
+    provider = PROVIDERS[name]
+    return provider.from_env() if hasattr(provider, 'from_env') else provider()
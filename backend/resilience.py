@@ -0,0 +1,197 @@
+"""上游呼叫的流量控制
+
+TokenBucket：限制每秒向上游送出的代號數量，平滑批次抓取的瞬間流量。
+CircuitBreaker：同一主機連續失敗達門檻後暫停呼叫一段時間，再以單次試探恢復。
+ResilientProvider：包裝資料來源，套用上述兩者，並對暫時性錯誤以指數退避加隨機抖動重試。
+"""
+import os
+import random
+import threading
+import time
+
+
+class UpstreamThrottled(Exception):
+    """上游回報限流；partial 為同一次呼叫中仍成功取得的 {ticker: DataFrame}"""
+
+    def __init__(self, message, partial=None, failed=()):
+        super().__init__(message)
+        self.partial = partial or {}
+        self.failed = list(failed)
+
+
+class CircuitOpenError(Exception):
+    """斷路器開啟中，暫不呼叫上游"""
+
+
+class TokenBucket:
+    """權杖桶：每秒補充 rate 個，最多累積 capacity 個
+
+    被上游限流時 slow_down 將速率減半，成功時 speed_up 逐步加回設定值（AIMD），
+    讓實際速率停在上游可容忍的上限附近。
+    """
+
+    def __init__(self, rate=5.0, capacity=50, min_rate=0.2):
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+    def acquire(self, tokens=1, timeout=None):
+        """取得 tokens 個權杖（超過容量時以容量計），逾時回傳 False"""
+        tokens = min(float(tokens), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+
+class CircuitBreaker:
+    """closed → 連續失敗 threshold 次 → open → reset_timeout 秒後 half-open（只放行一次試探）"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = int(threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """第 attempt 次重試前的等待秒數（full jitter）"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class ResilientProvider:
+    """在資料來源外加上限流、重試與依主機區分的斷路器"""
+
+    def __init__(self, inner, bucket=None, retries=3, backoff_base=0.5, backoff_cap=8.0,
+                 breaker_threshold=5, breaker_reset=30.0, acquire_timeout=30.0):
+        self.inner = inner
+        self.name = inner.name
+        self.host = getattr(inner, 'host', inner.name)
+        self.bucket = bucket or TokenBucket()
+        self.retries = int(retries)
+        self.backoff_base = float(backoff_base)
+        self.backoff_cap = float(backoff_cap)
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.acquire_timeout = float(acquire_timeout)
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, inner):
+        env = os.environ.get
+        return cls(
+            inner,
+            bucket=TokenBucket(float(env('UPSTREAM_RATE', 5)), float(env('UPSTREAM_BURST', 50))),
+            retries=int(env('UPSTREAM_RETRIES', 3)),
+            backoff_base=float(env('UPSTREAM_BACKOFF_BASE', 0.5)),
+            backoff_cap=float(env('UPSTREAM_BACKOFF_MAX', 8)),
+            breaker_threshold=int(env('BREAKER_THRESHOLD', 5)),
+            breaker_reset=float(env('BREAKER_RESET', 30)),
+        )
+
+    def breaker(self, host=None):
+        host = host or self.host
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self.breakers[host]
+
+    def __getattr__(self, name):
+        # 其他屬性（例如 FakeProvider 的統計）直接轉給內層
+        return getattr(self.inner, name)
+
+    def download(self, tickers, start, end, deadline=None, **kwargs):
+        """deadline 為呼叫端放棄等待的時間（time.monotonic()）
+
+        到期後不再等待權杖、退避或重試：排程器已不再等這個工作，繼續重試只會
+        佔住上游（例如 Yahoo 的整批下載鎖），結果也會被丟棄。
+        """
+        breaker = self.breaker()
+        frames = {}
+        remaining = list(tickers)
+        error = TimeoutError(f"{self.host} 已超過抓取期限")
+
+        for attempt in range(self.retries + 1):
+            left = self.acquire_timeout if deadline is None else deadline - time.monotonic()
+            if left <= 0:
+                break
+            if not breaker.allow():
+                raise CircuitOpenError(f"{self.host} 斷路器開啟中")
+            if not self.bucket.acquire(len(remaining), timeout=min(self.acquire_timeout, left)):
+                raise UpstreamThrottled(f"{self.host} 限流等待逾時", frames, remaining)
+
+            try:
+                frames.update(self.inner.download(remaining, start, end, **kwargs))
+                breaker.record_success()
+                self.bucket.speed_up()
+                return frames
+            except UpstreamThrottled as e:
+                self.bucket.slow_down()
+                frames.update(e.partial)
+                remaining = e.failed or [t for t in remaining if t not in frames]
+                error = e
+            except Exception as e:
+                error = e
+            breaker.record_failure()
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    print(f"放棄重試 ({', '.join(remaining)})，已接近抓取期限: {error}")
+                    break
+                print(f"重試 ({', '.join(remaining)}) 第 {attempt + 1} 次，{delay:.1f} 秒後: {error}")
+                time.sleep(delay)
+
+        if frames:
+            return frames
+        raise error
@@ -0,0 +1,108 @@
+"""JSON 回應工具：ETag 條件請求、gzip/brotli 壓縮與欄式格式
+
+內容未變時回傳 304；壓縮後的表示法使用加上編碼後綴的 ETag，
+比對 If-None-Match 時忽略後綴。brotli 為選用套件，未安裝時只提供 gzip。
+"""
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 小於此大小的內容不壓縮
+MIN_COMPRESS_SIZE = 1024
+
+
+def json_bytes(payload):
+    """鍵排序、無多餘空白的 JSON，相同內容產生相同位元組"""
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def choose_encoding(accept_encoding):
+    """依 Accept-Encoding 選擇 'br'、'gzip' 或 None"""
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def encode_json(payload, status=200, accept_encoding=None, if_none_match=()):
+    """不依賴框架的條件式 JSON 編碼，回傳 (status, body, headers)
+
+    if_none_match 為客戶端送來的 ETag 值（不含引號）清單。
+    """
+    body = json_bytes(payload)
+    etag = hashlib.sha1(body).hexdigest()[:20]
+
+    encoding = choose_encoding(accept_encoding)
+    if len(body) < MIN_COMPRESS_SIZE:
+        encoding = None
+    tag = f"{etag}-{encoding}" if encoding else etag
+
+    headers = {'ETag': f'"{tag}"', 'Vary': 'Accept-Encoding'}
+    if status == 200 and any(t == '*' or t.split('-')[0] == etag for t in if_none_match):
+        return 304, b'', headers
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    headers['Content-Type'] = 'application/json'
+    return status, compress(body, encoding), headers
+
+
+def parse_if_none_match(value):
+    """把 If-None-Match 標頭拆成不含引號與 W/ 的 ETag 清單"""
+    tags = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part.startswith('W/'):
+            part = part[2:]
+        if part:
+            tags.append(part.strip('"'))
+    return tags
+
+
+def conditional_json(payload, status=200, headers=None):
+    """產生帶 ETag 的 Flask JSON 回應，支援 If-None-Match 與壓縮"""
+    status, body, extra = encode_json(
+        payload, status,
+        accept_encoding=request.headers.get('Accept-Encoding'),
+        if_none_match=parse_if_none_match(request.headers.get('If-None-Match')),
+    )
+    response = Response(body, status=status)
+    for key, value in {**extra, **(headers or {})}.items():
+        response.headers[key] = value
+    return response
+
+
+def columnar(rows, fields):
+    """把 [dict] 轉成每個欄位一個陣列；category 以索引編碼，分類名稱另列"""
+    categories = []
+    index = {}
+    out = {field: [] for field in fields}
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            if field == 'category':
+                if value not in index:
+                    index[value] = len(categories)
+                    categories.append(value)
+                value = index[value]
+            out[field].append(value)
+    if 'category' in out:
+        out['categories'] = categories
+    return out
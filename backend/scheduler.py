@@ -0,0 +1,105 @@
+"""抓取排程器
+
+以有上限的執行緒池同時執行多個抓取工作，並套用單一工作逾時與整體期限；
+逾時的工作直接放棄（執行緒在背景自行結束），呼叫端拿到部分結果與逾時清單，
+不會被單一緩慢的代號卡住整個回應。
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+# 有工作仍在排隊時，檢查逾時的最長間隔（秒）
+QUEUED_POLL = 0.1
+
+
+class FetchResult(NamedTuple):
+    results: dict
+    timed_out: list
+    failed: list
+
+
+class FetchScheduler:
+    """有併發上限、單一工作逾時與整體期限的抓取排程器"""
+
+    def __init__(self, max_workers=8, task_timeout=10.0, deadline=25.0):
+        self.max_workers = max(1, int(max_workers))
+        self.task_timeout = float(task_timeout)
+        self.deadline = float(deadline)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=os.environ.get('FETCH_MAX_WORKERS', 8),
+            task_timeout=os.environ.get('FETCH_TASK_TIMEOUT', 10),
+            deadline=os.environ.get('FETCH_DEADLINE', 25),
+        )
+
+    def run(self, jobs):
+        """執行 {key: fn(deadline)}，回傳 FetchResult（以 key 表示結果/逾時/失敗）
+
+        單一工作的逾時從它實際開始執行時計算；排隊中的工作只受整體期限約束。
+        deadline 為排程器放棄這個工作的時間（time.monotonic()），工作應在此之前結束重試。
+        """
+        results, timed_out, failed = {}, [], []
+        if not jobs:
+            return FetchResult(results, timed_out, failed)
+
+        started, finished = {}, {}
+        deadline = time.monotonic() + self.deadline
+
+        def call(key, fn):
+            started[key] = time.monotonic()
+            try:
+                return fn(min(started[key] + self.task_timeout, deadline))
+            finally:
+                finished[key] = time.monotonic()
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)),
+                                      thread_name_prefix='fetch')
+        try:
+            futures = {executor.submit(call, key, fn): key for key, fn in jobs.items()}
+            pending = set(futures)
+
+            while pending:
+                now = time.monotonic()
+                for future in list(pending):
+                    begin = started.get(futures[future])
+                    if begin is not None and not future.done() and now - begin >= self.task_timeout:
+                        pending.discard(future)
+                        timed_out.append(futures[future])
+
+                if not pending:
+                    break
+                if now >= deadline:
+                    timed_out.extend(futures[f] for f in pending)
+                    break
+
+                # 下一次檢查：整體期限或最早到期的執行中工作；仍有排隊中的工作時
+                # 它隨時可能開始，改為定期檢查，才不會漏掉它的逾時
+                wake = deadline
+                for future in pending:
+                    begin = started.get(futures[future])
+                    if begin is None:
+                        wake = min(wake, now + min(self.task_timeout, QUEUED_POLL))
+                    else:
+                        wake = min(wake, begin + self.task_timeout)
+                done, pending = wait(pending, timeout=max(0.01, wake - now),
+                                     return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key = futures[future]
+                    if finished.get(key, 0.0) - started.get(key, 0.0) > self.task_timeout:
+                        # 執行超過單一工作逾時才完成的結果不採用，與仍在執行的逾時工作一致
+                        timed_out.append(key)
+                        continue
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        print(f"錯誤 ({key}): {str(e)}")
+                        failed.append(key)
+        finally:
+            # 不等待逾時的工作；尚未開始的直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return FetchResult(results, timed_out, failed)
@@ -0,0 +1,107 @@
+"""指標篩選（screener）
+
+ScreenIndex 在快照版本變動時重建一次：每個指標欄位保存依值排序的代號索引（argsort），
+篩選條件以 searchsorted 在排序後的值上找出範圍，排序直接沿用預先算好的順序，
+查詢成本為 O(條件數 × log n + 結果數)，不逐檔比較。
+"""
+import math
+import re
+
+from lazy import LazyModule
+
+np = LazyModule('numpy')
+
+# 參數名稱 <欄位>_<運算子>，例如 rsi_lt=30、month_gte=5
+OPERATORS = ('lt', 'lte', 'gt', 'gte')
+FILTER_PARAM = re.compile(r'^(\w+)_(' + '|'.join(OPERATORS) + r')$')
+
+
+class ScreenIndex:
+    """某個快照版本的排序索引；建立後不再變動，可在多個執行緒間共用"""
+
+    def __init__(self, version, data, fields, categories=None):
+        """data 為 {ticker: metrics}；categories 為 {分類: [代號, ...]}"""
+        self.version = version
+        self.fields = list(fields)
+        self.tickers = list(data)
+        self.position = {t: i for i, t in enumerate(self.tickers)}
+        self.order = {}  # 欄位 -> 依值遞增的代號位置，NaN 在最後
+        self.sorted = {}  # 欄位 -> 排序後的非 NaN 值
+        for field in self.fields:
+            values = np.array([_number(data[t].get(field)) for t in self.tickers], dtype=float)
+            order = np.argsort(values, kind='stable')
+            self.order[field] = order
+            self.sorted[field] = values[order][:int((~np.isnan(values)).sum())]
+        self.category_masks = {}
+        for category, members in (categories or {}).items():
+            mask = np.zeros(len(self.tickers), dtype=bool)
+            mask[[self.position[t] for t in members if t in self.position]] = True
+            self.category_masks[category] = mask
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def match(self, field, op, value):
+        """符合單一條件的代號位置（布林遮罩）"""
+        values = self.sorted[field]
+        lo, hi = 0, len(values)
+        if op == 'lt':
+            hi = np.searchsorted(values, value, 'left')
+        elif op == 'lte':
+            hi = np.searchsorted(values, value, 'right')
+        elif op == 'gt':
+            lo = np.searchsorted(values, value, 'right')
+        elif op == 'gte':
+            lo = np.searchsorted(values, value, 'left')
+        mask = np.zeros(len(self.tickers), dtype=bool)
+        mask[self.order[field][lo:hi]] = True
+        return mask
+
+    def query(self, filters=(), sort=None, descending=True, limit=50, categories=None):
+        """回傳 (符合的總數, [ticker, ...])
+
+        filters 為 [(欄位, 運算子, 值)]；sort 為排序欄位（None 則依原本順序），
+        該欄位為 NaN 的代號排在最後。
+        """
+        mask = np.ones(len(self.tickers), dtype=bool)
+        if categories is not None:
+            allowed = np.zeros(len(self.tickers), dtype=bool)
+            for category in categories:
+                allowed |= self.category_masks[category]
+            mask &= allowed
+        for field, op, value in filters:
+            mask &= self.match(field, op, value)
+
+        if sort is None:
+            positions = np.flatnonzero(mask)
+        else:
+            order = self.order[sort]
+            valid = len(self.sorted[sort])
+            ranked = order[:valid][::-1] if descending else order[:valid]
+            ranked = np.concatenate([ranked, order[valid:]])
+            positions = ranked[mask[ranked]]
+        return int(mask.sum()), [self.tickers[i] for i in positions[:limit]]
+
+
+def _number(value):
+    return np.nan if value is None else float(value)
+
+
+def parse_filters(args, fields):
+    """從查詢參數取出 [(欄位, 運算子, 值)]；格式錯誤或未知欄位時拋出 ValueError"""
+    filters = []
+    for key, raw in args.items():
+        match = FILTER_PARAM.match(key)
+        if match is None:
+            continue
+        field, op = match.groups()
+        if field not in fields:
+            raise ValueError(f"未知的欄位: {field}")
+        try:
+            value = float(raw)
+        except ValueError:
+            raise ValueError(f"{key} 必須為數字") from None
+        if not math.isfinite(value):
+            raise ValueError(f"{key} 必須為有限的數字")
+        filters.append((field, op, value))
+    return filters
@@ -0,0 +1,214 @@
+"""跨 worker 的共享快取
+
+以多個 worker 行程執行時，只有取得租約（lease）的 leader 會向上游抓取並發布最新快照，
+其他 follower 只讀取已發布的快照，不再各自抓取整個代號清單。後端可替換：
+
+- memory：行程內的字典，用法與 Redis 相同的本機替身（單一行程或測試用）
+- sqlite：SQLite WAL 模式，讀取不會被寫入阻擋；租約為帶到期時間的資料列
+- mmap：快照寫成檔案後以 os.replace 原子替換，follower 以 mmap 映射，
+  只讀檔頭的版本號判斷有無更新；租約為對租約檔的 flock，leader 結束時自動釋放
+
+每個後端都提供 try_lead(owner, ttl)、publish(version, data)、read(known_version)；
+read 在版本與 known_version 相同時回傳 None，否則回傳 (version, {ticker: metrics})。
+"""
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LEASE_NAME = 'refresh'
+
+
+class MemoryStore:
+    """行程內的共享快取"""
+
+    name = 'memory'
+
+    def __init__(self, path=None):
+        self._lease = None  # (owner, 到期時間)
+        self._snapshot = (0, {})
+        self._lock = threading.Lock()
+
+    def try_lead(self, owner, ttl):
+        now = time.time()
+        with self._lock:
+            if self._lease is None or self._lease[0] == owner or self._lease[1] <= now:
+                self._lease = (owner, now + ttl)
+                return True
+            return False
+
+    def publish(self, version, data):
+        with self._lock:
+            self._snapshot = (version, dict(data))
+
+    def read(self, known_version=None):
+        with self._lock:
+            version, data = self._snapshot
+        if not data or version == known_version:
+            return None
+        return version, dict(data)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """SQLite WAL 共享快取；連線在 fork 之後的行程中重新建立"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def try_lead(self, owner, ttl):
+        """沒有租約、租約已過期或本來就是自己時取得（續約）；單一寫入陳述式，行程間不會同時成功"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE '
+                    'SET owner = excluded.owner, expires = excluded.expires '
+                    'WHERE leases.owner = excluded.owner OR leases.expires <= ?',
+                    (LEASE_NAME, owner, now + ttl, now))
+                row = conn.execute('SELECT owner FROM leases WHERE name = ?', (LEASE_NAME,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def publish(self, version, data):
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO snapshot VALUES (1, ?, ?)', (version, payload))
+
+    def read(self, known_version=None):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT version, CASE WHEN version = ? THEN NULL ELSE data END FROM snapshot WHERE id = 1',
+                (known_version,)).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], json.loads(row[1])
+
+
+# 檔頭：魔術字、版本、內容長度
+_HEADER = struct.Struct('<8sQQ')
+_MAGIC = b'STKSNAP1'
+
+
+class MmapStore:
+    """以 mmap 讀取的快照檔；租約為 path + '.lease' 的 flock（僅支援 Unix）"""
+
+    name = 'mmap'
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise ValueError("mmap 共享快取需要 fcntl（僅支援 Unix）")
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lease_fd = None
+        self._map = None
+        self._identity = None  # 目前映射的檔案 (inode, mtime)
+        self._lock = threading.Lock()
+
+    def try_lead(self, owner, ttl):
+        """flock 由持有的行程保有到結束為止，ttl 不需要"""
+        with self._lock:
+            if self._lease_fd is not None:
+                return True
+            fd = os.open(self.path + '.lease', os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            self._lease_fd = fd
+            return True
+
+    def publish(self, version, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.shared-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, version, len(body)))
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def read(self, known_version=None):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            identity = (stat.st_ino, stat.st_mtime_ns)
+            if self._identity != identity:
+                # 檔案被替換過，重新映射（舊的映射在此關閉）
+                with open(self.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._map is not None:
+                    self._map.close()
+                self._map, self._identity = mapped, identity
+            magic, version, length = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or version == known_version:
+                return None
+            body = self._map[_HEADER.size:_HEADER.size + length]
+        return version, json.loads(body)
+
+
+SHARED_STORES = {
+    'memory': MemoryStore,
+    'sqlite': SQLiteStore,
+    'mmap': MmapStore,
+}
+
+
+def create_shared(name=None, path=None):
+    """依名稱（或環境變數 SHARED_CACHE）建立共享快取；未設定時回傳 None（各 worker 自行抓取）"""
+    name = (name if name is not None else os.environ.get('SHARED_CACHE', '')).lower()
+    if not name:
+        return None
+    if name not in SHARED_STORES:
+        raise ValueError(f"未知的共享快取: {name}")
+    if path is None:
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', f'shared.{name}')
+        path = os.environ.get('SHARED_CACHE_PATH', default)
+    return SHARED_STORES[name](path)
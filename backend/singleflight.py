@@ -0,0 +1,77 @@
+"""請求合併（single-flight）
+
+同一個鍵同時只會有一次上游抓取；其他同時到達的請求等待並共用那次的結果。
+以鍵為單位合併，所以 /api/stocks 整批抓取與 /api/stock/AAPL 也能共用同一次抓取。
+"""
+import threading
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = {}
+        self.error = None
+
+
+class SingleFlight:
+    """以鍵為單位合併同時進行的呼叫，並統計被合併的次數"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def do_many(self, keys, fn):
+        """取得多個鍵的結果；fn(尚無人抓取的鍵) 須回傳 {key: value}
+
+        已有其他呼叫在抓取的鍵會等待並共用其結果；若那次呼叫失敗，
+        該鍵不會出現在回傳值中。自己負責的鍵若 fn 拋出例外則往上拋。
+        """
+        own, waiting = [], {}
+        with self._lock:
+            self.calls += len(keys)
+            for key in keys:
+                flight = self._flights.get(key)
+                if flight is not None:
+                    waiting[key] = flight
+                else:
+                    own.append(key)
+            self.coalesced += len(waiting)
+            self.executed += len(own)
+            if own:
+                mine = _Flight()
+                for key in own:
+                    self._flights[key] = mine
+
+        results = {}
+        if own:
+            try:
+                mine.result = fn(own)
+                results.update((k, v) for k, v in mine.result.items() if k in own)
+            except BaseException as e:
+                mine.error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in own:
+                        if self._flights.get(key) is mine:
+                            del self._flights[key]
+                mine.done.set()
+
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if flight.error is None and key in flight.result:
+                results[key] = flight.result[key]
+        return results
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._flights),
+        }
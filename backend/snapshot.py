@@ -0,0 +1,112 @@
+"""版本化的指標快照
+
+每次有代號的指標變動就產生一個新版本，並在有上限的環狀紀錄中保存
+每個版本變動了哪些代號；客戶端帶著上次拿到的版本號即可只取回之後變動的部分。
+版本太舊（已不在紀錄中）或不認得（例如伺服器重新啟動）時改回傳完整快照。
+
+save／restore 把最新快照落地，重新啟動後可先提供上次的指標；
+載入的代號標記為 stale，直到下一次更新取得新值為止。
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+class SnapshotStore:
+    """保存最新指標與最近 history 個版本的變動紀錄"""
+
+    def __init__(self, history=256):
+        self.version = 0
+        self._data = {}
+        self._changes = deque(maxlen=history)  # (version, frozenset(tickers))
+        self._stale = set()  # 從檔案載入、尚未重新抓取的代號
+        self.saved_at = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def update(self, results):
+        """合併 {ticker: metrics}，有變動時版本加一；回傳 (版本, 變動內容)"""
+        with self._lock:
+            self._stale.difference_update(results)
+            changed = {t: v for t, v in results.items() if self._data.get(t) != v}
+            if changed:
+                self.version += 1
+                self._data.update(changed)
+                self._changes.append((self.version, frozenset(changed)))
+            return self.version, changed
+
+    def merge(self, version, results):
+        """併入其他 worker 發布的快照；版本號至少與對方相同，回傳 (版本, 變動內容)"""
+        with self._lock:
+            self._stale.difference_update(results)
+            changed = {t: v for t, v in results.items() if self._data.get(t) != v}
+            if changed:
+                self.version = max(self.version + 1, version)
+                self._data.update(changed)
+                self._changes.append((self.version, frozenset(changed)))
+            return self.version, changed
+
+    def current(self):
+        """回傳 (版本, 完整快照)"""
+        with self._lock:
+            return self.version, dict(self._data)
+
+    def since(self, version):
+        """回傳 (目前版本, 是否為完整快照, {ticker: metrics})"""
+        with self._lock:
+            oldest = self._changes[0][0] if self._changes else self.version + 1
+            if version is None or version > self.version or version < oldest - 1:
+                return self.version, True, dict(self._data)
+
+            tickers = set()
+            for v, changed in reversed(self._changes):
+                if v <= version:
+                    break
+                tickers |= changed
+            return self.version, False, {t: self._data[t] for t in tickers}
+
+    def stale_tickers(self, tickers):
+        """tickers 中仍是載入自檔案、尚未更新的代號"""
+        with self._lock:
+            return [t for t in tickers if t in self._stale]
+
+    def save(self, path):
+        """以暫存檔加 os.replace 原子寫入，程序中途結束也不會留下寫到一半的檔案"""
+        with self._save_lock:
+            with self._lock:
+                state = {'version': self.version, 'saved_at': time.time(), 'data': dict(self._data)}
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def restore(self, path):
+        """載入 save 寫出的快照；檔案不存在或無法解析時回傳 False"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            data, version = dict(state['data']), int(state['version'])
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"錯誤 (載入快照): {str(e)}")
+            return False
+
+        with self._lock:
+            # 沿用檔案中的版本號，客戶端手上的版本在重新啟動後仍然遞增
+            self.version = max(self.version, version)
+            self._data.update(data)
+            self._stale.update(data)
+            self.saved_at = state.get('saved_at')
+        return True
@@ -0,0 +1,80 @@
+"""Server-Sent Events 推播
+
+共用的背景更新迴圈每次算完指標、快照產生新版本後呼叫 Broadcaster.publish，
+只把數值有變動的代號推給所有連線中的客戶端；多一個觀看者只多一條連線，
+不會多一輪上游抓取。每則訊息的 id 為快照版本，客戶端重新連線時
+瀏覽器會帶上 Last-Event-ID，只需補送之後的變動。
+"""
+import json
+import queue
+import threading
+
+
+def format_event(event, data, event_id=None):
+    """組成一則 SSE 訊息"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    prefix = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{prefix}event: {event}\ndata: {payload}\n\n"
+
+
+class Broadcaster:
+    """把快照的變動推送給訂閱者
+
+    每個訂閱者有一個有上限的佇列；客戶端太慢導致佇列滿時會被斷線，
+    重新連線後再依 Last-Event-ID 補齊。
+    """
+
+    def __init__(self, max_queue=64):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, version, changed):
+        """推送某個快照版本的變動 {ticker: metrics}"""
+        if not changed:
+            return
+        with self._lock:
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait((version, changed))
+                except queue.Full:
+                    self._subscribers.discard(q)
+                    # 放入 None 讓該連線結束
+                    try:
+                        q.get_nowait()
+                        q.put_nowait(None)
+                    except (queue.Empty, queue.Full):
+                        pass
+
+    def events(self, q, version, initial, render, full=True, heartbeat=15.0):
+        """產生 SSE 字串：先送 snapshot（或補送的 update），之後為 update 與心跳註解"""
+        try:
+            yield format_event('snapshot' if full else 'update', render(initial), version)
+            while True:
+                try:
+                    item = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if item is None:
+                    return
+                item_version, changed = item
+                if item_version <= version:
+                    continue
+                yield format_event('update', render(changed), item_version)
+        finally:
+            self.unsubscribe(q)
@@ -0,0 +1,141 @@
+"""Prometheus 格式的指標
+
+不依賴 prometheus_client，只實作需要的 Counter、Histogram 與在輸出時才取值的
+Gauge（callback），由 render() 產生 text exposition format 0.0.4。
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.label_names, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [各 bucket 計數..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets + (float('inf'),), series[:-2] + [series[-1]]):
+                    lines.append(f'{self.name}_bucket'
+                                 f'{_labels(self.label_names, labels, [("le", _number(bound))])} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}')
+                lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {series[-1]}')
+        return lines
+
+
+class GaugeCallback:
+    """輸出時才呼叫 fn() 取值；fn 回傳 {labels tuple: value}"""
+
+    def __init__(self, name, help, labels, fn, kind='gauge'):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.fn, self.kind = fn, kind
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self.fn().items()):
+            lines.append(f'{self.name}{_labels(self.label_names, labels)} {_number(value)}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge_callback(self, name, help, labels, fn, kind='gauge'):
+        return self.register(GaugeCallback(name, help, labels, fn, kind))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'stock_http_request_duration_seconds', 'HTTP 請求處理時間', ('method', 'route', 'status'))
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    'stock_upstream_fetch_duration_seconds', '上游抓取時間（整批抓取時記在批內每個代號）', ('ticker',))
+UPSTREAM_RESULTS = REGISTRY.counter(
+    'stock_upstream_fetch_total', '上游抓取結果（以代號計）', ('outcome',))
+STAGE_LATENCY = REGISTRY.histogram(
+    'stock_stage_duration_seconds', '各處理階段的時間', ('stage',))
+ERRORS = REGISTRY.counter(
+    'stock_errors_total', '錯誤次數', ('stage',))
+REFRESH_SKIPPED = REGISTRY.counter(
+    'stock_refresh_skipped_total', '休市中略過的背景更新（以代號計）', ('asset_class',))
@@ -0,0 +1,105 @@
+"""代號清單（universe）設定
+
+從 JSON（或安裝了 PyYAML 時的 YAML）檔載入分類、代號、各分類的更新間隔與優先順序：
+
+    {"categories": [
+        {"name": "大盤指數", "refresh_interval": 60, "priority": 1,
+         "tickers": {"標普500指數": "^GSPC", ...}},
+        ...
+    ]}
+
+priority 數字越小越先更新；refresh_interval 為背景更新的秒數。
+asset_classes（可省略）覆寫個別代號的資產類別（決定交易時段，見 market_hours.py），例如
+{"DX-Y.NYB": "futures"}；未列出的代號依後綴判斷。
+"""
+import json
+import os
+from typing import NamedTuple
+
+from market_hours import ASSET_CLASSES, classify
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+DEFAULT_REFRESH_INTERVAL = 60
+DEFAULT_PRIORITY = 2
+
+
+class Category(NamedTuple):
+    name: str
+    tickers: dict  # {名稱: 代號}
+    refresh_interval: float
+    priority: int
+
+
+class Universe:
+    """依設定檔順序保存的分類清單"""
+
+    def __init__(self, categories, asset_classes=None):
+        self.categories = list(categories)
+        self.asset_classes = dict(asset_classes or {})
+        self._by_name = {c.name: c for c in self.categories}
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def tickers_by_category(self):
+        """{分類: {名稱: 代號}}，與原本 CATEGORIZED_TICKERS 的結構相同"""
+        return {c.name: dict(c.tickers) for c in self.categories}
+
+    def tickers(self, names=None):
+        """依序列出（指定分類的）代號，不重複"""
+        seen = {}
+        for c in self.categories:
+            if names is None or c.name in names:
+                for ticker in c.tickers.values():
+                    seen.setdefault(ticker, None)
+        return list(seen)
+
+    def asset_class(self, ticker):
+        """代號的資產類別：設定檔覆寫，否則依後綴判斷"""
+        return self.asset_classes.get(ticker) or classify(ticker)
+
+    @property
+    def tick(self):
+        """背景更新檢查的間隔：各分類更新間隔中最短者"""
+        return min((c.refresh_interval for c in self.categories), default=DEFAULT_REFRESH_INTERVAL)
+
+    def due(self, now, last_refreshed):
+        """到期需要更新的分類，依優先順序分組：[[Category, ...], ...]"""
+        groups = {}
+        for c in self.categories:
+            if now - last_refreshed.get(c.name, float('-inf')) >= c.refresh_interval:
+                groups.setdefault(c.priority, []).append(c)
+        return [groups[p] for p in sorted(groups)]
+
+
+def load_universe(path):
+    """載入設定檔；格式錯誤時拋出 ValueError"""
+    with open(path, encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yml', '.yaml'):
+            if yaml is None:
+                raise ValueError("讀取 YAML 設定需要安裝 PyYAML")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    categories = []
+    for entry in (data or {}).get('categories', []):
+        if 'name' not in entry or not isinstance(entry.get('tickers'), dict):
+            raise ValueError(f"分類設定缺少 name 或 tickers: {entry}")
+        categories.append(Category(
+            name=entry['name'],
+            tickers=entry['tickers'],
+            refresh_interval=float(entry.get('refresh_interval', DEFAULT_REFRESH_INTERVAL)),
+            priority=int(entry.get('priority', DEFAULT_PRIORITY)),
+        ))
+    if not categories:
+        raise ValueError(f"設定檔沒有任何分類: {path}")
+    asset_classes = (data or {}).get('asset_classes') or {}
+    unknown = sorted(set(asset_classes.values()) - set(ASSET_CLASSES))
+    if unknown:
+        raise ValueError(f"未知的資產類別: {', '.join(unknown)}")
+    return Universe(categories, asset_classes)